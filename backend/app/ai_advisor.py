@@ -1,10 +1,14 @@
-from typing import List, Dict, Optional
+from typing import AsyncIterator, List, Dict, Optional, Tuple
 from app.config import Config
+import asyncio
 import json
 import re
+import time
 # import httpx  <-- No longer needed
 from fastapi import HTTPException
 import google.generativeai as genai
+from app.services.model_registry import ModelRegistry
+from app.services.singleflight import SingleFlight, TooManyWaiters
 
 # Configure the Google AI client at the top of the file
 if Config.GOOGLE_API_KEY:
@@ -12,110 +16,251 @@ if Config.GOOGLE_API_KEY:
 else:
     print("⚠️  GOOGLE_API_KEY not set - AI features will be disabled")
 
-async def generate_ai_response(prompt: str, model: Optional[str] = None) -> dict:
-    """Generate AI response using Google's Gemini API."""
-    
-    if not Config.GOOGLE_API_KEY:
-        raise HTTPException(status_code=400, detail="GOOGLE_API_KEY not set in environment")
-    
-    # Preferred models in order. We'll inspect what models are available
-    preferred = [
-        "gemini-2.0-pro", "gemini-2.0-flash", "gemini-pro", "gemini-1.0-pro",
-        "gemini-1.5-flash", "chat-bison-001", "text-bison-001"
-    ]
+# Shared across requests: discovered models, last working model and circuit breakers
+model_registry = ModelRegistry(ttl=Config.GEMINI_MODELS_TTL)
+
+# Identical prompts that arrive together share one generation
+_inflight = SingleFlight(max_waiters=Config.SINGLEFLIGHT_MAX_WAITERS)
 
-    # Try to list available models from the client to choose a supported model
+def _extract_text(response) -> Optional[str]:
+    """Pull the generated text out of a Gemini response object (or dict-shaped response)"""
+    text = None
+    if hasattr(response, 'text') and response.text:
+        text = response.text
+    elif isinstance(response, dict):
+        # some clients return dict shapes
+        # look for candidates -> content -> parts -> text
+        candidates_resp = response.get('candidates') or response.get('outputs') or response.get('output')
+        if isinstance(candidates_resp, list) and candidates_resp:
+            first = candidates_resp[0]
+            if isinstance(first, dict):
+                # content.parts.text
+                content = first.get('content') or first
+                parts = content.get('parts') if isinstance(content, dict) else None
+                if parts and isinstance(parts, list) and parts[0].get('text'):
+                    text = parts[0]['text']
+        # fallback to stringifying
+        if not text:
+            text = json.dumps(response)
+    return text
+
+async def generate_text(
+    prompt: str,
+    preferred: List[str],
+    requested: Optional[str] = None,
+    generation_config: Optional[Dict] = None,
+    attempt_timeout: float = Config.GEMINI_ATTEMPT_TIMEOUT,
+    deadline: float = Config.GEMINI_DEADLINE
+) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """
+    Try candidate models in registry order without blocking the event loop.
+    Each attempt gets at most ``attempt_timeout`` seconds, and all attempts
+    together at most ``deadline`` seconds. Concurrent calls with the same
+    prompt and settings share one generation.
+    Returns (text, model, last_error); text is None if every attempt failed.
+    """
+    key = (prompt, tuple(preferred), requested, json.dumps(generation_config, sort_keys=True))
+    # Slack over the deadline covers model discovery and the final attempt's overrun
+    timeout = deadline + attempt_timeout
     try:
-        available = genai.list_models()
-        # `available` may be a dict or list depending on library; normalize to list of ids
-        model_ids = []
-        if isinstance(available, dict):
-            # some clients return {'models': [...]}
-            for m in available.get('models', []) or []:
-                if isinstance(m, dict) and m.get('name'):
-                    model_ids.append(m['name'])
-                elif isinstance(m, str):
-                    model_ids.append(m)
-        elif isinstance(available, list):
-            for m in available:
-                if isinstance(m, dict) and m.get('name'):
-                    model_ids.append(m['name'])
-                elif isinstance(m, str):
-                    model_ids.append(m)
-        else:
-            # fallback: stringify
-            model_ids = [str(available)]
-    except Exception as e:
-        # If listing models fails, capture the error and continue with preferred list
-        print(f"Warning: failed to list models: {e}")
-        model_ids = []
-
-    # Build candidate list: requested model first, then preferred models that appear available, then preferred list
-    candidates = []
-    if model:
-        candidates.append(model)
-    # add intersection of preferred and available (keep order)
-    for p in preferred:
-        if model_ids and p in model_ids:
-            candidates.append(p)
-    # finally, append preferred list to try even if not listed (some clients/project configs differ)
-    for p in preferred:
-        if p not in candidates:
-            candidates.append(p)
+        return await _inflight.do(
+            key,
+            lambda: _generate_text(prompt, preferred, requested, generation_config, attempt_timeout, deadline),
+            timeout=timeout
+        )
+    except TooManyWaiters as e:
+        return None, None, str(e)
+    except asyncio.TimeoutError:
+        return None, None, f"timed out after {timeout:.1f}s"
+
+async def _generate_text(
+    prompt: str,
+    preferred: List[str],
+    requested: Optional[str],
+    generation_config: Optional[Dict],
+    attempt_timeout: float,
+    deadline: float
+) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    await model_registry.refresh_if_stale()
+    started = time.monotonic()
 
     last_error = None
-    for candidate in candidates:
+    for candidate in model_registry.candidates(preferred, requested=requested):
+        remaining = deadline - (time.monotonic() - started)
+        if remaining <= 0:
+            last_error = f"deadline of {deadline:.1f}s exceeded"
+            break
         try:
             print(f"Attempting model: {candidate}")
             model_instance = genai.GenerativeModel(candidate)
             # Try async generation if available
             try:
-                response = await model_instance.generate_content_async(
-                    prompt,
-                    generation_config={
-                        "temperature": 0.7,
-                        "top_k": 40,
-                        "top_p": 0.95,
-                        "max_output_tokens": 1024
-                    }
-                )
+                call = model_instance.generate_content_async(prompt, generation_config=generation_config)
             except AttributeError:
-                # Fallback to sync method
-                response = model_instance.generate_content(prompt)
-
-            # Extract text
-            text = None
-            if hasattr(response, 'text') and response.text:
-                text = response.text
-            elif isinstance(response, dict):
-                # some clients return dict shapes
-                # look for candidates -> content -> parts -> text
-                candidates_resp = response.get('candidates') or response.get('outputs') or response.get('output')
-                if isinstance(candidates_resp, list) and candidates_resp:
-                    first = candidates_resp[0]
-                    if isinstance(first, dict):
-                        # content.parts.text
-                        content = first.get('content') or first
-                        parts = content.get('parts') if isinstance(content, dict) else None
-                        if parts and isinstance(parts, list) and parts[0].get('text'):
-                            text = parts[0]['text']
-                # fallback to stringifying
-                if not text:
-                    text = json.dumps(response)
+                # Fallback to the sync method, off the event loop
+                call = asyncio.to_thread(model_instance.generate_content, prompt, generation_config=generation_config)
+            response = await asyncio.wait_for(call, timeout=min(attempt_timeout, remaining))
 
+            text = _extract_text(response)
             if text:
-                return {"result": str(text).strip(), "model": candidate}
+                model_registry.record_success(candidate)
+                return str(text), candidate, None
 
             last_error = "no text in response"
+            model_registry.record_failure(candidate)
+        except asyncio.TimeoutError:
+            last_error = f"timed out after {min(attempt_timeout, remaining):.1f}s"
+            model_registry.record_failure(candidate)
+            print(f"Model {candidate} failed: {last_error}")
+        except Exception as e:
+            last_error = str(e)
+            model_registry.record_failure(candidate)
+            print(f"Model {candidate} failed: {last_error}")
+
+    return None, None, last_error
+
+def _chunk_text(chunk) -> Optional[str]:
+    """Text of one streamed chunk; chunks without parts (e.g. safety stops) have none"""
+    try:
+        return chunk.text
+    except (AttributeError, ValueError):
+        return None
+
+async def stream_text(
+    prompt: str,
+    preferred: List[str],
+    requested: Optional[str] = None,
+    generation_config: Optional[Dict] = None,
+    attempt_timeout: float = Config.GEMINI_ATTEMPT_TIMEOUT,
+    deadline: float = Config.GEMINI_DEADLINE
+) -> AsyncIterator[Dict]:
+    """
+    Streaming counterpart of ``generate_text``. Candidate models are tried in
+    registry order until one produces its first chunk (within the same
+    attempt/deadline budget); after that the answer is committed to that model
+    and each later chunk may take up to ``attempt_timeout`` seconds.
+    Yields {'model': name} once, then {'text': chunk} for each chunk.
+    Raises RuntimeError(last_error) if no model produced any text, or if a
+    later chunk does not arrive within ``attempt_timeout``.
+    """
+    await model_registry.refresh_if_stale()
+    started = time.monotonic()
+
+    async def first_chunk(model_instance):
+        response = await model_instance.generate_content_async(
+            prompt, generation_config=generation_config, stream=True
+        )
+        chunks = response.__aiter__()
+        async for chunk in chunks:
+            text = _chunk_text(chunk)
+            if text:
+                return chunks, text
+        return chunks, None
+
+    last_error = None
+    for candidate in model_registry.candidates(preferred, requested=requested):
+        remaining = deadline - (time.monotonic() - started)
+        if remaining <= 0:
+            last_error = f"deadline of {deadline:.1f}s exceeded"
+            break
+        try:
+            print(f"Attempting streamed model: {candidate}")
+            model_instance = genai.GenerativeModel(candidate)
+            chunks, text = await asyncio.wait_for(
+                first_chunk(model_instance), timeout=min(attempt_timeout, remaining)
+            )
+        except asyncio.TimeoutError:
+            last_error = f"no output within {min(attempt_timeout, remaining):.1f}s"
+            model_registry.record_failure(candidate)
+            print(f"Model {candidate} failed: {last_error}")
+            continue
         except Exception as e:
             last_error = str(e)
+            model_registry.record_failure(candidate)
             print(f"Model {candidate} failed: {last_error}")
             continue
+        if not text:
+            last_error = "no text in response"
+            model_registry.record_failure(candidate)
+            continue
+
+        model_registry.record_success(candidate)
+        yield {"model": candidate}
+        yield {"text": text}
+        while True:
+            try:
+                chunk = await asyncio.wait_for(chunks.__anext__(), timeout=attempt_timeout)
+            except StopAsyncIteration:
+                return
+            except asyncio.TimeoutError:
+                raise RuntimeError(f"no output for {attempt_timeout:.1f}s") from None
+            if text := _chunk_text(chunk):
+                yield {"text": text}
+
+    raise RuntimeError(last_error or "no candidate models")
+
+# Preferred models in order; the registry reorders them by availability and past results
+AI_RESPONSE_MODELS = [
+    "gemini-2.0-pro", "gemini-2.0-flash", "gemini-pro", "gemini-1.0-pro",
+    "gemini-1.5-flash", "chat-bison-001", "text-bison-001"
+]
+
+AI_RESPONSE_CONFIG = {
+    "temperature": 0.7,
+    "top_k": 40,
+    "top_p": 0.95,
+    "max_output_tokens": 1024
+}
+
+async def stream_ai_response(prompt: str, model: Optional[str] = None) -> AsyncIterator[Dict]:
+    """
+    Streamed version of ``generate_ai_response``: yields {'model': ...} and then
+    {'text': chunk} events. Errors before the first chunk raise the same
+    HTTPExceptions as the non-streamed call, so callers can await the first
+    event before committing to a streaming response.
+    """
+    if not Config.GOOGLE_API_KEY:
+        raise HTTPException(status_code=400, detail="GOOGLE_API_KEY not set in environment")
+
+    try:
+        async for event in stream_text(prompt, AI_RESPONSE_MODELS, requested=model,
+                                       generation_config=AI_RESPONSE_CONFIG):
+            yield event
+    except RuntimeError as e:
+        raise HTTPException(status_code=404, detail=f"No usable models available. Last error: {e}")
+
+async def generate_ai_response(prompt: str, model: Optional[str] = None) -> dict:
+    """Generate AI response using Google's Gemini API."""
+    
+    if not Config.GOOGLE_API_KEY:
+        raise HTTPException(status_code=400, detail="GOOGLE_API_KEY not set in environment")
+    
+    text, used_model, last_error = await generate_text(
+        prompt,
+        AI_RESPONSE_MODELS,
+        requested=model,
+        generation_config=AI_RESPONSE_CONFIG
+    )
+    if text:
+        return {"result": text.strip(), "model": used_model}
 
     # nothing worked
     raise HTTPException(status_code=404, detail=f"No usable models available. Last error: {last_error}")
 
-def get_career_recommendations(
+def format_course_line(course: Dict) -> str:
+    """'- CASCS 111 [Undergraduate Lower]', with title/description only when they add something"""
+    code = course.get('code', '')
+    line = f"- {code}"
+    title = course.get('title')
+    if title and title != code:
+        line += f": {title}"
+    if course.get('level'):
+        line += f" [{course['level']}]"
+    if course.get('description'):
+        line += f" - {course['description'][:100]}"
+    return line
+
+async def get_career_recommendations(
     career_goal: str,
     available_courses: List[Dict],
     current_major: str = "Computer Science"
@@ -123,6 +268,11 @@ def get_career_recommendations(
     """
     Use Google Gemini to recommend courses for any career goal.
     Works for any major, not just CS!
+
+    available_courses should already be ranked by relevance to the goal;
+    only the first CAREER_PROMPT_COURSES are sent to the model. When it is
+    empty, the model is told no catalog courses matched and asked for the
+    kinds of courses to look for instead.
     """
     
     if not Config.GOOGLE_API_KEY:
@@ -131,11 +281,16 @@ def get_career_recommendations(
             "message": "Please add GOOGLE_API_KEY to backend/.env file to use AI recommendations"
         }
     
-    # Format courses for Gemini
-    courses_text = "\n".join([
-        f"- {c['code']}: {c['title']} ({c.get('description', '')[:100]}...)" 
-        for c in available_courses[:20]
-    ])
+    # Format courses for Gemini, one compact line each
+    courses_text = "\n".join(
+        format_course_line(c) for c in available_courses[:Config.CAREER_PROMPT_COURSES]
+    )
+    if courses_text:
+        course_step = "Recommend 5-8 courses from the list that would best prepare the student"
+    else:
+        courses_text = "(No catalog courses matched this career goal or major, so no list is provided.)"
+        course_step = ("Recommend 5-8 kinds of courses to look for in the catalog, "
+                       "using the subject or topic in place of a course code")
     
     prompt = f"""You are a career advisor helping a {current_major} student plan their courses.
 
@@ -146,7 +301,7 @@ Available Courses:
 
 Based on this career goal, please:
 1. Identify 5-8 key skills needed for this career
-2. Recommend 5-8 courses from the list that would best prepare the student
+2. {course_step}
 3. Explain how each recommended course contributes to the career goal
 4. Estimate what percentage of required skills these courses would cover
 
@@ -178,35 +333,14 @@ Only return the JSON, no other text.
         "text-bison-001"
     ]
 
-    response_text = None
-    last_error = None
-    for model_name in model_candidates:
-        try:
-            print(f"Trying career recommendations with model: {model_name}")
-            model = genai.GenerativeModel(model_name)
-            # Use synchronous generation here (this function is sync)
-            try:
-                resp = model.generate_content(prompt)
-            except Exception as e:
-                # Some clients may raise; capture and continue
-                raise
-
-            # Extract text if present
-            response_text = getattr(resp, 'text', None) or (resp.get('text') if isinstance(resp, dict) else None) or str(resp)
-            print(f"Successfully generated career recommendations with model: {model_name}")
-            break
-
-        except Exception as e:
-            last_error = str(e)
-            print(f"Failed with model {model_name}: {last_error}")
-            response_text = None
-            continue
+    response_text, model_name, last_error = await generate_text(prompt, model_candidates)
 
     if not response_text:
         return {
             "error": "No available AI models found",
             "message": f"Please check your API key and enabled models. Last error: {last_error}"
         }
+    print(f"Successfully generated career recommendations with model: {model_name}")
 
     # Extract JSON from response
     try:
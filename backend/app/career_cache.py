@@ -0,0 +1,120 @@
+"""Persistent cache in front of the LLM career advisor.
+
+Recommendations are keyed by a normalized career goal and major plus the
+catalog version (so a new course file invalidates them), and stored in the
+same memory-LRU + SQLite cache used for OpenAlex responses. Preset career
+paths from the frontend can be generated ahead of time:
+
+    python -m app.career_cache [goal ...]
+
+With no goals, the preset names in frontend/src/data/careerPaths.ts are used.
+"""
+import asyncio
+import os
+import re
+import sys
+from typing import Dict, List, Optional
+
+from app.ai_advisor import get_career_recommendations
+from app.config import Config
+from app.services.cache import TieredCache
+from app.services.catalog import get_catalog
+from app.services.singleflight import SingleFlight, TooManyWaiters
+from app.utils.text import tokenize
+
+DEFAULT_MAJOR = "Computer Science"
+
+CAREER_PATHS_FILE = os.path.join(
+    os.path.dirname(__file__), "..", "..", "frontend", "src", "data", "careerPaths.ts"
+)
+
+# Filler words that don't change what career is being asked about
+_GOAL_STOPWORDS = {
+    "a", "an", "the", "i", "want", "to", "be", "become", "work", "as", "in",
+    "career", "job", "my", "goal", "is", "and", "of", "for",
+}
+
+_cache = TieredCache(
+    Config.CAREER_CACHE_PATH or None,
+    ttl=Config.CAREER_CACHE_TTL,
+    max_memory_entries=256,
+    max_disk_entries=Config.CAREER_CACHE_MAX_ENTRIES,
+)
+
+# Goals that normalize to the same key share one generation while it runs
+_inflight = SingleFlight(max_waiters=Config.SINGLEFLIGHT_MAX_WAITERS)
+
+
+def normalize_goal(text: str) -> str:
+    """Order-insensitive bag of meaningful words: 'I want to be an ML Engineer' -> 'engineer ml'"""
+    words = {word for word in tokenize(text) if word not in _GOAL_STOPWORDS}
+    return " ".join(sorted(words)) or " ".join(tokenize(text))
+
+
+def cache_key(career_goal: str, major: str, catalog_version: str) -> str:
+    return f"career:{catalog_version}:{normalize_goal(major)}:{normalize_goal(career_goal)}"
+
+
+async def get_cached_recommendations(career_goal: str, major: str = DEFAULT_MAJOR) -> Dict:
+    """Career recommendations, generated at most once per normalized goal/major/catalog"""
+    snapshot = get_catalog()
+    key = cache_key(career_goal, major, snapshot.version)
+    entry = await _cache.get(key)
+    if entry is not None:
+        return entry.value
+
+    async def generate() -> Dict:
+        # Only the courses most relevant to the goal go into the prompt; goals that match
+        # nothing still rank by the major. If neither matches, the prompt gets no course list.
+        relevant = snapshot.retriever.top_k(career_goal, Config.CAREER_PROMPT_COURSES, context=major)
+        recommendations = await get_career_recommendations(
+            career_goal=career_goal,
+            available_courses=relevant,
+            current_major=major
+        )
+        # Only cache real answers; errors should be retried next time
+        if isinstance(recommendations, dict) and "error" not in recommendations:
+            _cache.set(key, recommendations)
+        return recommendations
+
+    try:
+        return await _inflight.do(key, generate)
+    except TooManyWaiters as e:
+        return {"error": "Career advisor is busy", "message": str(e)}
+
+
+def preset_goals(path: str = CAREER_PATHS_FILE) -> List[str]:
+    """Career path names defined for the Progress page presets"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            source = f.read()
+    except OSError as e:
+        print(f"Could not read career presets from {path}: {e}")
+        return []
+    return re.findall(r"^\s*name:\s*['\"](.+?)['\"]", source, re.MULTILINE)
+
+
+async def warm_presets(goals: Optional[List[str]] = None, major: str = DEFAULT_MAJOR) -> int:
+    """Generate and cache recommendations for each goal; returns how many are now cached"""
+    goals = goals if goals is not None else preset_goals()
+    warmed = 0
+    for goal in goals:
+        result = await get_cached_recommendations(goal, major)
+        if "error" in result:
+            print(f"⚠️  Could not warm career cache for '{goal}': {result.get('message') or result['error']}")
+        else:
+            warmed += 1
+    print(f"🔥 Career advisor cache warmed for {warmed}/{len(goals)} goals")
+    return warmed
+
+
+def main():
+    if not Config.GOOGLE_API_KEY:
+        print("❌ GOOGLE_API_KEY is required to warm the career advisor cache")
+        return
+    goals = sys.argv[1:] or None
+    asyncio.run(warm_presets(goals))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Static context for the course-planning chatbot.
+
+The site description and instructions only depend on the catalog (course
+count and a few department names), so they are assembled once per catalog
+version instead of on every message. The static text is kept as the prompt
+prefix, ahead of the conversation, so providers that cache repeated prompt
+prefixes can reuse it across messages.
+"""
+from typing import Dict, List, Optional
+
+from app.services.catalog import CatalogSnapshot, get_catalog
+
+# Number of chat turns included with each question
+HISTORY_TURNS = 5
+
+
+class ChatbotContext:
+    """Prompt prefix and facts for one catalog version"""
+
+    def __init__(self, snapshot: CatalogSnapshot):
+        self.version = snapshot.version
+        self.course_count = len(snapshot.courses)
+
+        # Sample departments from the first 50 courses for better responses
+        departments = set()
+        for course in snapshot.courses[:50]:
+            if dept := course.get('department'):
+                departments.add(dept)
+        dept_list = ", ".join(sorted(departments)[:10])
+        course_count = self.course_count
+
+        self.website_knowledge = f"""
+WEBSITE STRUCTURE & NAVIGATION:
+The BU Course Planner has 5 main sections accessible from the top navigation bar:
+
+1. HOME (/) - Landing page with overview and quick access buttons
+2. EXPLORER (/explorer) - Browse and search {course_count} BU courses with filters
+3. PLANNER (/planner) - Drag-and-drop semester planning with PDF export
+4. PROGRESS (/progress) - AI career advisor for personalized course recommendations
+5. PROFESSORS (/professors) - Research faculty publications and generate cold emails
+
+KEY FEATURES & HOW TO USE THEM:
+
+📚 COURSE SEARCH (Explorer page):
+- Use the search bar to find courses by name, code, or keyword
+- Filter by department: {dept_list}, and more
+- Filter by level: Introductory, Intermediate, Advanced, Graduate
+- Click any course card to see full details
+
+📅 SEMESTER PLANNING (Planner page):
+- Click "Add Semester" button to create a new semester
+- Drag courses from the left sidebar into semester boards
+- Prerequisites are validated automatically
+- Export your plan to PDF with the "Export to PDF" button
+- Visual prerequisite flow shows course dependencies
+
+🎯 CAREER ADVISOR (Progress page):
+- Choose from preset career paths OR enter a custom career goal
+- AI analyzes your goal and recommends optimal courses
+- See required skills and skill coverage percentage
+- Click "Get Recommendations" to get AI-powered advice
+
+👨‍🏫 PROFESSOR RESEARCH (Professors page):
+- Browse all BU professors by department
+- Click a professor's name to see their research and publications
+- View research areas from OpenAlex database
+- Generate AI-powered professional cold emails
+
+NAVIGATION TIPS:
+- All main pages are accessible from the top navigation bar
+- Home page has quick action buttons for each feature
+- Use the chatbot (me!) anytime for help navigating
+"""
+
+        self.prompt_prefix = f"""You are an AI assistant for the BU Course Planner website. You help Boston University students with course planning and navigating the website.
+
+{self.website_knowledge}
+
+INSTRUCTIONS:
+- Be helpful, friendly, and conversational
+- Give specific navigation directions (e.g., "Click on 'Explorer' in the top menu")
+- Reference the exact page names and button labels from the website structure above
+- Suggest relevant features based on user needs
+- Keep responses concise (2-4 sentences) but informative
+- Use emojis sparingly for visual appeal
+- If asked about courses, mention that there are {course_count} courses available
+- Guide users to the right page for their needs with clear step-by-step directions
+"""
+
+    def build_prompt(self, user_message: str, chat_history: List[Dict]) -> str:
+        """Static prefix followed by the parts that change with every message"""
+        history = "\n".join(f"{msg['role']}: {msg['content']}" for msg in chat_history[-HISTORY_TURNS:])
+        return f"""{self.prompt_prefix}
+Previous conversation:
+{history}
+
+Current user question: {user_message}"""
+
+
+_context: Optional[ChatbotContext] = None
+
+
+def get_chatbot_context() -> ChatbotContext:
+    """Context for the current catalog, rebuilt only when the catalog version changes"""
+    global _context
+    snapshot = get_catalog()
+    if _context is None or _context.version != snapshot.version:
+        _context = ChatbotContext(snapshot)
+    return _context
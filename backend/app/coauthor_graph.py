@@ -0,0 +1,137 @@
+"""Faculty co-authorship graph built from the offline OpenAlex snapshot.
+
+Collaborator lists are aggregated once per snapshot version rather than per
+request: each faculty member's collaborators are stored pre-sorted, so top-k
+lookups are a slice, and BU-internal edges form an undirected graph used for
+shortest collaboration paths between two professors.
+
+Building the graph for the full roster takes seconds, so it is never done in
+a request: the app builds it at startup in a worker thread, and when the
+snapshot or roster is reloaded a background thread builds the replacement
+while handlers keep reading the previous graph.
+"""
+import threading
+from collections import deque
+from typing import Dict, List, Optional
+
+from app.openalex_service import count_coauthors, short_author_id
+from app.openalex_snapshot import get_snapshot_authors
+from app.professor_data import get_roster
+
+
+class CoauthorGraph:
+    def __init__(self, entries: Dict[str, Dict], faculty: Dict[str, Dict]):
+        """
+        entries: snapshot entries by short OpenAlex ID
+        faculty: roster records by short OpenAlex ID
+        """
+        self.faculty = faculty
+        self.collaborators: Dict[str, List[Dict]] = {}
+        internal: Dict[str, Dict[str, int]] = {}
+
+        for openalex_id, entry in entries.items():
+            if openalex_id not in faculty:
+                continue
+            coauthors = count_coauthors(openalex_id, entry.get('works', []))
+            for coauthor in coauthors:
+                coauthor_id = short_author_id(coauthor['id'])
+                record = faculty.get(coauthor_id)
+                coauthor['bu_faculty'] = record is not None
+                if record is None or coauthor_id == openalex_id:
+                    continue
+                coauthor['professor'] = record.get('emp_name', '')
+                # Undirected edge; either side's works may be the ones that show it
+                for a, b in ((openalex_id, coauthor_id), (coauthor_id, openalex_id)):
+                    edges = internal.setdefault(a, {})
+                    edges[b] = max(edges.get(b, 0), coauthor['count'])
+            self.collaborators[openalex_id] = coauthors
+
+        self.internal: Dict[str, List[Dict]] = {
+            openalex_id: [
+                {
+                    'id': coauthor_id,
+                    'name': faculty[coauthor_id].get('emp_name', ''),
+                    'count': count,
+                }
+                for coauthor_id, count in sorted(edges.items(), key=lambda edge: -edge[1])
+            ]
+            for openalex_id, edges in internal.items()
+        }
+
+    def __contains__(self, openalex_id: str) -> bool:
+        return openalex_id in self.collaborators
+
+    def stats(self) -> Dict:
+        return {
+            'faculty': len(self.collaborators),
+            'connected_faculty': len(self.internal),
+            'internal_edges': sum(len(edges) for edges in self.internal.values()) // 2,
+        }
+
+    def top_collaborators(self, openalex_id: str, limit: int = 10) -> List[Dict]:
+        """Most frequent collaborators (anywhere) of a faculty member"""
+        return self.collaborators.get(openalex_id, [])[:limit]
+
+    def internal_collaborators(self, openalex_id: str, limit: int = 10) -> List[Dict]:
+        """Most frequent BU faculty collaborators of a faculty member"""
+        return self.internal.get(openalex_id, [])[:limit]
+
+    def shortest_path(self, source: str, target: str, max_depth: int = 6) -> Optional[List[str]]:
+        """Fewest-hop chain of BU co-authors linking two faculty members (breadth-first)"""
+        if source == target:
+            return [source]
+        parents = {source: None}
+        frontier = deque([(source, 0)])
+        while frontier:
+            node, depth = frontier.popleft()
+            if depth >= max_depth:
+                continue
+            for edge in self.internal.get(node, []):
+                neighbor = edge['id']
+                if neighbor in parents:
+                    continue
+                parents[neighbor] = node
+                if neighbor == target:
+                    path = [target]
+                    while parents[path[-1]] is not None:
+                        path.append(parents[path[-1]])
+                    return path[::-1]
+                frontier.append((neighbor, depth + 1))
+        return None
+
+
+_EMPTY_GRAPH = CoauthorGraph({}, {})
+_graph: Optional[CoauthorGraph] = None
+_graph_sources = (None, None)
+_building: Optional[threading.Thread] = None
+_build_lock = threading.Lock()
+
+
+def build_coauthor_graph() -> CoauthorGraph:
+    """Build the graph for the current snapshot and roster and make it current (blocking)"""
+    global _graph, _graph_sources
+    with _build_lock:
+        entries = get_snapshot_authors()
+        roster = get_roster()
+        if _graph is not None and _graph_sources[0] is entries and _graph_sources[1] is roster:
+            return _graph
+        faculty = {short_author_id(record['oaid']): record for record in roster.records}
+        graph = CoauthorGraph(entries, faculty)
+        _graph, _graph_sources = graph, (entries, roster)
+        if entries:
+            print(f"✅ Built co-author graph: {graph.stats()}")
+        return graph
+
+
+def get_coauthor_graph() -> CoauthorGraph:
+    """
+    The most recently built graph (empty until the first build finishes).
+    If the snapshot or roster has been reloaded since, a rebuild is started
+    in a background thread.
+    """
+    global _building
+    sources_changed = _graph_sources[0] is not get_snapshot_authors() or _graph_sources[1] is not get_roster()
+    if (_graph is None or sources_changed) and not (_building is not None and _building.is_alive()):
+        _building = threading.Thread(target=build_coauthor_graph, name="coauthor-graph", daemon=True)
+        _building.start()
+    return _graph if _graph is not None else _EMPTY_GRAPH
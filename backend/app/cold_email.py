@@ -0,0 +1,81 @@
+"""Cold-email generation as background jobs.
+
+Writing an email means fetching the professor's OpenAlex profile and works
+and then running a Gemini generation, which can take well over ten seconds.
+``submit_cold_email`` queues that work and returns a job at once; identical
+requests (same professor, interests and course context) share one job while
+it runs and for a while after it finishes.
+"""
+import asyncio
+from typing import Dict
+
+from app.config import Config
+from app.openalex_service import (
+    generate_cold_email,
+    generate_research_summary,
+    get_author_data,
+    get_author_works,
+)
+from app.services.jobs import Job, JobQueue
+from app.utils.text import tokenize
+
+RESEARCH_UNAVAILABLE = "Could not fetch research data"
+
+
+async def compose_cold_email(request: Dict) -> Dict:
+    """Fetch the professor's research and write the email (the job handler)"""
+    oaid = request["oaid"]
+    author_data, works = await asyncio.gather(
+        get_author_data(oaid),
+        get_author_works(oaid, limit=10),
+    )
+    if not author_data:
+        raise RuntimeError(RESEARCH_UNAVAILABLE)
+
+    research_summary = generate_research_summary(author_data, works)
+    email = await generate_cold_email(
+        professor_name=request["professor_name"],
+        research_summary=research_summary,
+        student_interests=request["student_interests"],
+        course_context=request["course_context"]
+    )
+    if email.startswith("Error"):
+        # Failed jobs are not reused, so the next submission retries
+        raise RuntimeError(email)
+
+    return {
+        "email": email,
+        "professor": request["professor_name"],
+        "research_areas": [c.get('display_name') for c in author_data.get('x_concepts', [])[:5]]
+    }
+
+
+cold_email_jobs = JobQueue(
+    compose_cold_email,
+    workers=Config.COLD_EMAIL_WORKERS,
+    max_pending=Config.COLD_EMAIL_MAX_PENDING,
+    result_ttl=Config.COLD_EMAIL_RESULT_TTL,
+    name="cold-email",
+)
+
+
+def job_key(oaid: str, student_interests: str, course_context: str) -> tuple:
+    """Requests differing only in case, spacing or punctuation share a job"""
+    return (oaid, " ".join(tokenize(student_interests)), " ".join(tokenize(course_context)))
+
+
+def submit_cold_email(professor: Dict, student_interests: str, course_context: str) -> Job:
+    """
+    Queue an email for a roster professor (raises QueueFull when the queue is backed up).
+    The roster name is used rather than the name as typed, since jobs are shared per professor.
+    """
+    oaid = professor['oaid']
+    return cold_email_jobs.submit(
+        job_key(oaid, student_interests, course_context),
+        {
+            "oaid": oaid,
+            "professor_name": professor['emp_name'],
+            "student_interests": student_interests,
+            "course_context": course_context,
+        },
+    )
@@ -7,6 +7,51 @@ load_dotenv()
 class Config:
     GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY", "")
     DEBUG = os.getenv("DEBUG", "False").lower() == "true"
+    # Seconds before the discovered Gemini model list is refreshed
+    GEMINI_MODELS_TTL = float(os.getenv("GEMINI_MODELS_TTL", "3600"))
+    # Seconds allowed per Gemini model attempt, and for all fallback attempts of one request
+    GEMINI_ATTEMPT_TIMEOUT = float(os.getenv("GEMINI_ATTEMPT_TIMEOUT", "15"))
+    GEMINI_DEADLINE = float(os.getenv("GEMINI_DEADLINE", "30"))
+
+    # Career advisor response cache; CAREER_PREWARM generates the preset career paths at startup
+    CAREER_CACHE_PATH = os.getenv(
+        "CAREER_CACHE_PATH",
+        os.path.join(os.path.dirname(__file__), "..", "data", "cache", "career.sqlite3"),
+    )
+    CAREER_CACHE_TTL = float(os.getenv("CAREER_CACHE_TTL", str(7 * 24 * 3600)))
+    CAREER_CACHE_MAX_ENTRIES = int(os.getenv("CAREER_CACHE_MAX_ENTRIES", "2000"))
+    CAREER_PREWARM = os.getenv("CAREER_PREWARM", "False").lower() == "true"
+    # How many goal-relevant courses are listed in the career advisor prompt
+    CAREER_PROMPT_COURSES = int(os.getenv("CAREER_PROMPT_COURSES", "40"))
+    # Cold-email background jobs: worker count, max queued jobs, seconds results are kept
+    COLD_EMAIL_WORKERS = int(os.getenv("COLD_EMAIL_WORKERS", "2"))
+    COLD_EMAIL_MAX_PENDING = int(os.getenv("COLD_EMAIL_MAX_PENDING", "100"))
+    COLD_EMAIL_RESULT_TTL = float(os.getenv("COLD_EMAIL_RESULT_TTL", "3600"))
+    # Seconds between checks for a new course data file (negative disables hot reload)
+    CATALOG_RELOAD_INTERVAL = float(os.getenv("CATALOG_RELOAD_INTERVAL", "5"))
+    # Same, for the professor spreadsheet
+    PROFESSORS_RELOAD_INTERVAL = float(os.getenv("PROFESSORS_RELOAD_INTERVAL", "5"))
+
+    # OpenAlex response cache (memory LRU + SQLite file); set the path empty for memory only
+    OPENALEX_CACHE_PATH = os.getenv(
+        "OPENALEX_CACHE_PATH",
+        os.path.join(os.path.dirname(__file__), "..", "data", "cache", "openalex.sqlite3"),
+    )
+    OPENALEX_CACHE_TTL = float(os.getenv("OPENALEX_CACHE_TTL", str(24 * 3600)))
+    # How long past the TTL a stale entry may still be served while it is refreshed
+    OPENALEX_CACHE_STALE_TTL = float(os.getenv("OPENALEX_CACHE_STALE_TTL", str(7 * 24 * 3600)))
+    OPENALEX_CACHE_MAX_ENTRIES = int(os.getenv("OPENALEX_CACHE_MAX_ENTRIES", "5000"))
+    # Per-request timeout (seconds) and max concurrent OpenAlex requests per worker
+    OPENALEX_TIMEOUT = float(os.getenv("OPENALEX_TIMEOUT", "10"))
+    OPENALEX_MAX_CONCURRENCY = int(os.getenv("OPENALEX_MAX_CONCURRENCY", "10"))
+    # Offline snapshot built by `python -m app.openalex_snapshot`; OFFLINE=true never calls the live API
+    OPENALEX_SNAPSHOT_PATH = os.getenv(
+        "OPENALEX_SNAPSHOT_PATH",
+        os.path.join(os.path.dirname(__file__), "..", "data", "openalex_snapshot.json.gz"),
+    )
+    OPENALEX_OFFLINE = os.getenv("OPENALEX_OFFLINE", "False").lower() == "true"
+    # Max callers that may wait on one in-flight OpenAlex or Gemini call before new ones are turned away
+    SINGLEFLIGHT_MAX_WAITERS = int(os.getenv("SINGLEFLIGHT_MAX_WAITERS", "100"))
     
     @staticmethod
     def validate():
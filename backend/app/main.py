@@ -1,8 +1,40 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.routes import router
+from app.services.catalog import catalog
+from app.professor_data import reload_professors
+from app.openalex_service import close_client
+from app.openalex_snapshot import load_snapshot_authors
+from app.coauthor_graph import build_coauthor_graph
+from app.ai_advisor import model_registry
+from app.career_cache import warm_presets
+from app.cold_email import cold_email_jobs
+from app.config import Config
 
-app = FastAPI(title="BU Course Planner API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Parse the course catalog once per process instead of once per request
+    await asyncio.to_thread(catalog.load)
+    await asyncio.to_thread(reload_professors)
+    # The offline OpenAlex snapshot can be large; parse it off the event loop
+    await asyncio.to_thread(load_snapshot_authors)
+    await asyncio.to_thread(build_coauthor_graph)
+    if Config.GOOGLE_API_KEY:
+        # Discover Gemini models once up front instead of on every AI request
+        await asyncio.to_thread(model_registry.discover)
+        if Config.CAREER_PREWARM:
+            # Keep a reference so the task isn't garbage collected mid-run
+            app.state.career_prewarm = asyncio.create_task(warm_presets())
+    cold_email_jobs.start()
+    yield
+    await cold_email_jobs.stop()
+    await close_client()
+
+
+app = FastAPI(title="BU Course Planner API", lifespan=lifespan)
 
 # CORS settings - allow Replit domains and local development
 app.add_middleware(
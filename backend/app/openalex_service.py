@@ -1,7 +1,13 @@
-import requests
-from typing import Dict, List, Optional
+import asyncio
+import httpx
+from typing import Awaitable, Callable, Dict, List, Optional
+from urllib.parse import urlencode
 import google.generativeai as genai
 from app.config import Config
+from app.ai_advisor import generate_text
+from app.services.cache import TieredCache
+from app.services.singleflight import SingleFlight, TooManyWaiters
+from app.openalex_snapshot import AUTHOR_FIELDS, WORK_FIELDS, compact_author, compact_work, get_snapshot_author
 
 # Configure Google AI
 if Config.GOOGLE_API_KEY:
@@ -9,49 +15,251 @@ if Config.GOOGLE_API_KEY:
 
 OPENALEX_API = "https://api.openalex.org"
 
-def get_author_data(openalex_id: str) -> Optional[Dict]:
+# Works window used for co-author aggregation (and stored per author in the snapshot)
+COAUTHOR_WORKS_WINDOW = 50
+
+# Only the fields the API uses are requested (select=) and cached (compact_*):
+# full author and works objects are tens of KB each, and the cache limits count entries
+AUTHOR_SELECT = ",".join(AUTHOR_FIELDS + ('x_concepts',))
+WORK_SELECT = ",".join(WORK_FIELDS + ('authorships',))
+
+# Trimmed author and works responses, keyed by OpenAlex path + query params
+_cache = TieredCache(
+    Config.OPENALEX_CACHE_PATH or None,
+    ttl=Config.OPENALEX_CACHE_TTL,
+    stale_ttl=Config.OPENALEX_CACHE_STALE_TTL,
+    max_disk_entries=Config.OPENALEX_CACHE_MAX_ENTRIES,
+)
+_refreshing: Dict[str, asyncio.Task] = {}
+
+# Concurrent misses for the same key share one upstream request
+_inflight = SingleFlight(max_waiters=Config.SINGLEFLIGHT_MAX_WAITERS)
+# Covers queueing for the concurrency limit as well as the request itself
+OPENALEX_CALL_TIMEOUT = Config.OPENALEX_TIMEOUT * 3
+
+# Shared keep-alive connection pool, created on first use in the running loop
+_client: Optional[httpx.AsyncClient] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+
+def get_client() -> httpx.AsyncClient:
+    """The process-wide OpenAlex HTTP client"""
+    global _client, _semaphore
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            base_url=OPENALEX_API,
+            timeout=httpx.Timeout(Config.OPENALEX_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=Config.OPENALEX_MAX_CONCURRENCY,
+                max_keepalive_connections=Config.OPENALEX_MAX_CONCURRENCY,
+            ),
+            headers={"User-Agent": "BU-Course-Planner"},
+        )
+        # Caps in-flight OpenAlex requests per worker so bursts queue instead of piling up
+        _semaphore = asyncio.Semaphore(Config.OPENALEX_MAX_CONCURRENCY)
+    return _client
+
+async def close_client():
+    """Close the shared client (called on application shutdown)"""
+    global _client
+    for task in list(_refreshing.values()):
+        task.cancel()
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+async def _fetch_and_store(key: str, fetch: Callable[[], Awaitable]):
+    value = await fetch()
+    if value is not None:
+        _cache.set(key, value)
+    return value
+
+async def _coalesced_fetch(key: str, fetch: Callable[[], Awaitable]):
+    """One upstream fetch per key at a time; overload and timeouts count as failed fetches"""
+    try:
+        return await _inflight.do(key, lambda: _fetch_and_store(key, fetch), timeout=OPENALEX_CALL_TIMEOUT)
+    except TooManyWaiters as e:
+        print(f"OpenAlex request for {key} rejected: {e}")
+    except asyncio.TimeoutError:
+        print(f"OpenAlex request for {key} timed out after {OPENALEX_CALL_TIMEOUT:.1f}s")
+    return None
+
+async def _refresh(key: str, fetch: Callable[[], Awaitable]):
+    try:
+        await _coalesced_fetch(key, fetch)
+    finally:
+        _refreshing.pop(key, None)
+
+async def _fresh_fetch(key: str, fetch: Callable[[], Awaitable]):
+    """Always call upstream (bypassing cached values); successful responses still refresh the cache"""
+    value = await fetch()
+    if value is not None:
+        _cache.set(key, value)
+    return value
+
+async def _cached_fetch(key: str, fetch: Callable[[], Awaitable]):
     """
-    Fetch author data from OpenAlex API
-    Example ID: A5023147820 or full URL
+    Serve ``key`` from cache, awaiting ``fetch`` only on a miss.
+    Stale entries are returned immediately and refreshed in a background task.
+    Concurrent misses share one fetch; failed fetches (None) are never cached.
     """
+    entry = await _cache.get(key)
+    if entry is not None:
+        if not _cache.is_fresh(entry) and key not in _refreshing:
+            _refreshing[key] = asyncio.create_task(_refresh(key, fetch))
+        return entry.value
+
+    return await _coalesced_fetch(key, fetch)
+
+def short_author_id(openalex_id: str) -> str:
+    """A5023147820 from either a bare ID or a full OpenAlex URL"""
     # Extract ID from URL if full URL provided
     if 'openalex.org' in openalex_id:
         openalex_id = openalex_id.split('/')[-1]
-    
-    url = f"{OPENALEX_API}/authors/{openalex_id}"
-    
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        return response.json()
-    except Exception as e:
-        print(f"Error fetching OpenAlex data: {e}")
-        return None
+    return openalex_id
 
-def get_author_works(openalex_id: str, limit: int = 10) -> List[Dict]:
-    """Get recent publications by an author"""
-    if 'openalex.org' in openalex_id:
-        openalex_id = openalex_id.split('/')[-1]
+async def _fetch_json(path: str, params: Optional[Dict] = None) -> Dict:
+    client = get_client()
+    async with _semaphore:
+        response = await client.get(f"/{path}", params=params)
+    response.raise_for_status()
+    return response.json()
+
+async def get_author_data(openalex_id: str, use_snapshot: bool = True, use_cache: bool = True) -> Optional[Dict]:
+    """
+    Fetch author data from OpenAlex API
+    Example ID: A5023147820 or full URL
+    Served from the offline snapshot when it covers this author.
+    use_cache=False always asks OpenAlex (the response is still cached).
+    """
+    openalex_id = short_author_id(openalex_id)
+    if use_snapshot:
+        snapshot_entry = get_snapshot_author(openalex_id)
+        if snapshot_entry is not None:
+            return snapshot_entry['author']
+        if Config.OPENALEX_OFFLINE:
+            return None
+    path = f"authors/{openalex_id}"
+
+    async def fetch():
+        try:
+            return compact_author(await _fetch_json(path, {'select': AUTHOR_SELECT}))
+        except Exception as e:
+            print(f"Error fetching OpenAlex data: {e}")
+            return None
+
+    if not use_cache:
+        return await _fresh_fetch(path, fetch)
+    return await _cached_fetch(path, fetch)
+
+async def get_author_works(openalex_id: str, limit: int = 10, use_snapshot: bool = True,
+                           use_cache: bool = True) -> List[Dict]:
+    """
+    Get recent publications by an author (from the offline snapshot when it has enough).
+    use_cache=False always asks OpenAlex (the response is still cached).
+    """
+    openalex_id = short_author_id(openalex_id)
+    if use_snapshot:
+        snapshot_entry = get_snapshot_author(openalex_id)
+        snapshot_works = snapshot_entry['works'] if snapshot_entry else None
+        # The snapshot only holds the most recent works, so larger windows go live
+        if snapshot_works is not None and (limit <= len(snapshot_works) or len(snapshot_works) < COAUTHOR_WORKS_WINDOW):
+            return snapshot_works[:limit]
+        if Config.OPENALEX_OFFLINE:
+            return (snapshot_works or [])[:limit]
     
-    url = f"{OPENALEX_API}/works"
     params = {
         'filter': f'author.id:{openalex_id}',
         'sort': 'publication_date:desc',
-        'per-page': limit
+        'per-page': limit,
+        'select': WORK_SELECT
+    }
+
+    async def fetch():
+        try:
+            data = await _fetch_json("works", params)
+            return [compact_work(work) for work in data.get('results', [])]
+        except Exception as e:
+            print(f"Error fetching works: {e}")
+            return None
+
+    key = f"works?{urlencode(sorted(params.items()))}"
+    if not use_cache:
+        return await _fresh_fetch(key, fetch) or []
+    return await _cached_fetch(key, fetch) or []
+
+# Max IDs per OR-filter request (OpenAlex allows up to 100 values; 50 keeps URLs short)
+OPENALEX_BATCH_SIZE = 50
+
+async def _fetch_author_batch(openalex_ids: List[str]) -> Dict[str, Dict]:
+    params = {
+        'filter': 'openalex_id:' + '|'.join(openalex_ids),
+        'per-page': len(openalex_ids),
+        'select': AUTHOR_SELECT
     }
-    
     try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        return response.json().get('results', [])
+        data = await _fetch_json("authors", params)
     except Exception as e:
-        print(f"Error fetching works: {e}")
-        return []
+        print(f"Error fetching OpenAlex author batch: {e}")
+        return {}
+
+    found = {}
+    for author in data.get('results', []):
+        openalex_id = short_author_id(author.get('id', ''))
+        if openalex_id:
+            author = compact_author(author)
+            # Same key as get_author_data, so later single lookups hit the cache
+            _cache.set(f"authors/{openalex_id}", author)
+            found[openalex_id] = author
+    return found
+
+async def get_authors_batch(openalex_ids: List[str], use_snapshot: bool = True,
+                            use_cache: bool = True) -> Dict[str, Dict]:
+    """
+    Fetch many authors at once using OpenAlex's OR filter
+    (openalex_id:A1|A2|...). Authors in the offline snapshot or with a
+    fresh cache entry are not re-requested unless use_cache=False.
+    Returns {short OpenAlex ID: author data}.
+    """
+    results = {}
+    not_in_snapshot = []
+    for openalex_id in dict.fromkeys(short_author_id(i) for i in openalex_ids if i):
+        snapshot_entry = get_snapshot_author(openalex_id) if use_snapshot else None
+        if snapshot_entry is not None:
+            results[openalex_id] = snapshot_entry['author']
+        else:
+            not_in_snapshot.append(openalex_id)
+
+    # One disk read for the whole batch rather than one per author
+    cached = await _cache.get_many(f"authors/{i}" for i in not_in_snapshot) if use_cache else {}
+    missing = []
+    for openalex_id in not_in_snapshot:
+        entry = cached.get(f"authors/{openalex_id}")
+        if entry is not None and _cache.is_fresh(entry):
+            results[openalex_id] = entry.value
+        else:
+            missing.append(openalex_id)
 
-def get_coauthors(openalex_id: str, limit: int = 10) -> List[Dict]:
-    """Get frequent collaborators"""
-    works = get_author_works(openalex_id, limit=50)
+    if use_snapshot and Config.OPENALEX_OFFLINE:
+        return results
+
+    batches = [missing[i:i + OPENALEX_BATCH_SIZE] for i in range(0, len(missing), OPENALEX_BATCH_SIZE)]
+    for found in await asyncio.gather(*(_fetch_author_batch(batch) for batch in batches)):
+        results.update(found)
+    return results
+
+async def get_coauthors(openalex_id: str, limit: int = 10, works: Optional[List[Dict]] = None) -> List[Dict]:
+    """
+    Get frequent collaborators.
+    Pass ``works`` (the author's most recent publications) to reuse an
+    existing fetch instead of downloading COAUTHOR_WORKS_WINDOW works again.
+    """
+    if works is None:
+        works = await get_author_works(openalex_id, limit=COAUTHOR_WORKS_WINDOW)
     
+    return count_coauthors(openalex_id, works)[:limit]
+
+def count_coauthors(openalex_id: str, works: List[Dict]) -> List[Dict]:
+    """All collaborators on ``works``, most frequent first"""
     coauthor_counts = {}
     
     for work in works:
@@ -83,13 +291,11 @@ def get_coauthors(openalex_id: str, limit: int = 10) -> List[Dict]:
                     coauthor_counts[author_id]['institutions'].append(inst_name)
     
     # Sort by collaboration count
-    sorted_coauthors = sorted(
+    return sorted(
         coauthor_counts.values(),
         key=lambda x: x['count'],
         reverse=True
     )
-    
-    return sorted_coauthors[:limit]
 
 def generate_research_summary(author_data: Dict, works: List[Dict]) -> str:
     """Generate a text summary of research"""
@@ -115,7 +321,7 @@ def generate_research_summary(author_data: Dict, works: List[Dict]) -> str:
             summary += f"- {title} ({year}) - {citations} citations\n"
     
     return summary
-def generate_cold_email(
+async def generate_cold_email(
     professor_name: str,
     research_summary: str,
     student_interests: str,
@@ -170,26 +376,9 @@ Generate the email:"""
             'models/gemini-flash-latest',        # Flash latest
         ]
         
-        successful_response = None
-        last_error = None
-        
-        for model_name in model_names:
-            try:
-                print(f"Trying model: {model_name}")
-                model = genai.GenerativeModel(model_name)
-                response = model.generate_content(prompt)
-                
-                if response.text:
-                    successful_response = response.text
-                    print(f"Success with model: {model_name}")
-                    break
-                    
-            except Exception as e:
-                last_error = str(e)
-                print(f"Model {model_name} failed: {e}")
-                continue
-        
+        successful_response, model_name, last_error = await generate_text(prompt, model_names)
         if successful_response:
+            print(f"Success with model: {model_name}")
             return successful_response
         else:
             return f"Error: No working model found. Last error: {last_error}\n\nPlease check your GOOGLE_API_KEY and try again."
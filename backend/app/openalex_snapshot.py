@@ -0,0 +1,230 @@
+"""Offline OpenAlex snapshot for the professor research pages.
+
+The snapshot is a gzipped JSON file holding, for every ``oaid`` in the
+professor spreadsheet, a trimmed author profile and that author's most recent
+works (enough for the recent-works list and co-author aggregation). When the
+file exists, ``openalex_service`` serves authors found in it from local disk;
+with ``OPENALEX_OFFLINE=true`` it never calls the live API at all. Pointing
+``OPENALEX_SNAPSHOT_PATH`` at a recorded file gives tests a fixed fixture.
+
+Build or refresh it with:
+
+    python -m app.openalex_snapshot [--department "Computer Science"] [--full]
+
+Refreshes are incremental: author profiles are re-read in batches, and works
+are only re-fetched for authors whose ``updated_date`` changed.
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from app.config import Config
+
+SNAPSHOT_FORMAT = 1
+
+AUTHOR_FIELDS = (
+    'id', 'orcid', 'display_name', 'works_count', 'cited_by_count',
+    'summary_stats', 'last_known_institutions', 'updated_date',
+)
+WORK_FIELDS = ('id', 'doi', 'title', 'publication_year', 'publication_date', 'cited_by_count')
+
+# Seconds between checks of the snapshot file's modification time
+SNAPSHOT_CHECK_INTERVAL = 5
+
+_loaded: Optional[Dict] = None
+_loaded_mtime: Optional[float] = None
+_last_check = 0.0
+_reloading: Optional[threading.Thread] = None
+_load_lock = threading.Lock()
+_NO_AUTHORS: Dict[str, Dict] = {}
+
+
+def compact_author(author: Dict) -> Dict:
+    """Keep only the author fields the API and frontend use"""
+    compact = {field: author.get(field) for field in AUTHOR_FIELDS if field in author}
+    compact['x_concepts'] = [
+        {key: concept.get(key) for key in ('id', 'display_name', 'level', 'score')}
+        for concept in (author.get('x_concepts') or [])[:10]
+    ]
+    return compact
+
+
+def compact_work(work: Dict) -> Dict:
+    """Keep only the work fields used for listings and co-author counts"""
+    compact = {field: work.get(field) for field in WORK_FIELDS}
+    compact['authorships'] = [
+        {
+            'author': {
+                'id': (authorship.get('author') or {}).get('id', ''),
+                'display_name': (authorship.get('author') or {}).get('display_name', ''),
+            },
+            'institutions': [
+                {'display_name': inst.get('display_name', '')}
+                for inst in (authorship.get('institutions') or [])[:1]
+            ],
+        }
+        for authorship in work.get('authorships') or []
+    ]
+    return compact
+
+
+def load_snapshot(path: Optional[str] = None) -> Dict:
+    """Read a snapshot file; an empty snapshot if it does not exist"""
+    path = path or Config.OPENALEX_SNAPSHOT_PATH
+    if not path or not os.path.exists(path):
+        return {'format': SNAPSHOT_FORMAT, 'generated_at': None, 'authors': {}}
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_snapshot(snapshot: Dict, path: Optional[str] = None):
+    """Write a snapshot atomically"""
+    path = path or Config.OPENALEX_SNAPSHOT_PATH
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+        json.dump(snapshot, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _snapshot_mtime() -> Optional[float]:
+    path = Config.OPENALEX_SNAPSHOT_PATH
+    if not path:
+        return None
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+def load_snapshot_authors() -> Dict[str, Dict]:
+    """(Re)load the snapshot file if it changed (blocking; run at startup or in a thread)"""
+    global _loaded, _loaded_mtime, _last_check
+    with _load_lock:
+        _last_check = time.monotonic()
+        mtime = _snapshot_mtime()
+        if mtime is None:
+            _loaded, _loaded_mtime = None, None
+            return _NO_AUTHORS
+        if _loaded is None or mtime != _loaded_mtime:
+            try:
+                _loaded = load_snapshot(Config.OPENALEX_SNAPSHOT_PATH)
+                print(f"✅ Loaded OpenAlex snapshot with {len(_loaded.get('authors', {}))} authors")
+            except Exception as e:
+                print(f"Error loading OpenAlex snapshot: {e}")
+                _loaded = {'authors': {}}
+            _loaded_mtime = mtime
+        return _loaded.get('authors', {})
+
+def _reload_in_background():
+    global _reloading
+    if _reloading is not None and _reloading.is_alive():
+        return
+    print("🔄 OpenAlex snapshot changed on disk, reloading in the background")
+    _reloading = threading.Thread(target=load_snapshot_authors, name="openalex-snapshot", daemon=True)
+    _reloading.start()
+
+def get_snapshot_authors() -> Dict[str, Dict]:
+    """
+    All snapshot entries by short OpenAlex ID. Never parses the file itself:
+    it is loaded at startup (``load_snapshot_authors``), and a changed file is
+    reloaded in a background thread while the previous version keeps serving.
+    """
+    global _last_check
+    if time.monotonic() - _last_check >= SNAPSHOT_CHECK_INTERVAL:
+        _last_check = time.monotonic()
+        if _snapshot_mtime() != _loaded_mtime:
+            _reload_in_background()
+    if _loaded is None:
+        return _NO_AUTHORS
+    return _loaded.get('authors', {})
+
+
+def get_snapshot_author(openalex_id: str) -> Optional[Dict]:
+    """Snapshot entry ({'author': ..., 'works': [...]}) for a short OpenAlex ID, if any"""
+    return get_snapshot_authors().get(openalex_id)
+
+
+async def refresh_snapshot(oaids: List[str], snapshot: Dict, full: bool = False) -> Dict[str, int]:
+    """Bring ``snapshot`` up to date for ``oaids``; returns counts of what changed"""
+    from app.openalex_service import (
+        COAUTHOR_WORKS_WINDOW,
+        close_client,
+        get_author_works,
+        get_authors_batch,
+        short_author_id,
+    )
+
+    authors = snapshot.setdefault('authors', {})
+    stats = {'checked': 0, 'updated': 0, 'unchanged': 0, 'missing': 0, 'failed': 0}
+    try:
+        ids = list(dict.fromkeys(short_author_id(oaid) for oaid in oaids if oaid))
+        # Skip the response cache: a cached profile or works list could pair a new
+        # updated_date with old works, which later runs would then treat as current
+        profiles = await get_authors_batch(ids, use_snapshot=False, use_cache=False)
+        stats['checked'] = len(ids)
+        stats['missing'] = len(ids) - len(profiles)
+
+        changed = [
+            openalex_id for openalex_id, profile in profiles.items()
+            if full
+            or openalex_id not in authors
+            or authors[openalex_id]['author'].get('updated_date') != profile.get('updated_date')
+        ]
+        stats['unchanged'] = len(profiles) - len(changed)
+
+        async def refresh_one(openalex_id: str):
+            profile = profiles[openalex_id]
+            works = await get_author_works(
+                openalex_id, limit=COAUTHOR_WORKS_WINDOW, use_snapshot=False, use_cache=False
+            )
+            if not works and profile.get('works_count'):
+                # Works fetch failed; keep the old entry so the next run retries
+                stats['failed'] += 1
+                return
+            authors[openalex_id] = {
+                'author': compact_author(profile),
+                'works': [compact_work(work) for work in works],
+            }
+
+        # get_author_works is bounded by the shared client's concurrency limit
+        await asyncio.gather(*(refresh_one(openalex_id) for openalex_id in changed))
+        stats['updated'] = len(changed) - stats['failed']
+    finally:
+        await close_client()
+
+    snapshot['format'] = SNAPSHOT_FORMAT
+    snapshot['generated_at'] = time.time()
+    return stats
+
+
+def main():
+    from app.professor_data import get_all_professors, get_professors_by_department
+
+    parser = argparse.ArgumentParser(description="Build or refresh the offline OpenAlex snapshot")
+    parser.add_argument('--department', help="Only refresh professors in this department")
+    parser.add_argument('--full', action='store_true', help="Re-fetch works for every author")
+    parser.add_argument('--output', default=Config.OPENALEX_SNAPSHOT_PATH, help="Snapshot file path")
+    args = parser.parse_args()
+
+    if args.department:
+        professors = get_professors_by_department(args.department)
+    else:
+        professors = get_all_professors()
+
+    print(f"📚 Refreshing OpenAlex snapshot for {len(professors)} professors -> {args.output}")
+    snapshot = load_snapshot(args.output)
+    stats = asyncio.run(refresh_snapshot([p.get('oaid', '') for p in professors], snapshot, full=args.full))
+    save_snapshot(snapshot, args.output)
+
+    print(f"✅ Checked {stats['checked']}, updated {stats['updated']}, "
+          f"unchanged {stats['unchanged']}, not found {stats['missing']}, failed {stats['failed']}")
+    print(f"📁 Snapshot now covers {len(snapshot['authors'])} authors")
+
+
+if __name__ == "__main__":
+    main()
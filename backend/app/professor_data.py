@@ -1,9 +1,17 @@
 import pandas as pd
 from typing import List, Dict, Optional
+import hashlib
 import os
+import pickle
+import threading
+import time
+from app.config import Config
 
 # Load professor data
 PROFESSORS_FILE = os.path.join(os.path.dirname(__file__), '../data/openalex_dict_vHack.xlsx')
+# Parsed copy of the spreadsheet so later startups skip pandas/openpyxl parsing
+PROFESSORS_CACHE_FILE = PROFESSORS_FILE + '.cache.pkl'
+PROFESSORS_CACHE_FORMAT = 1
 
 def load_professors() -> pd.DataFrame:
     """Load professor data from Excel file"""
@@ -18,38 +26,178 @@ def load_professors() -> pd.DataFrame:
         print(f"Error loading professors: {e}")
         return pd.DataFrame()
 
-def get_professors_by_department(department: str) -> List[Dict]:
-    """Get all professors in a department"""
+def _file_hash(path: str) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def _read_records_cache(source_hash: str) -> Optional[List[Dict]]:
+    """Records from the sidecar cache, if it was built from this exact spreadsheet"""
+    try:
+        with open(PROFESSORS_CACHE_FILE, 'rb') as f:
+            cached = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Ignoring unreadable professor cache: {e}")
+        return None
+    if cached.get('format') != PROFESSORS_CACHE_FORMAT or cached.get('source_hash') != source_hash:
+        return None
+    columns = cached['columns']
+    return [dict(zip(columns, row)) for row in cached['rows']]
+
+def _write_records_cache(source_hash: str, df: pd.DataFrame):
+    """Store the parsed rows as compact tuples next to the spreadsheet"""
+    payload = {
+        'format': PROFESSORS_CACHE_FORMAT,
+        'source_hash': source_hash,
+        'columns': [str(column) for column in df.columns],
+        'rows': [tuple(str(value) for value in row) for row in df.itertuples(index=False, name=None)],
+    }
+    tmp_path = f"{PROFESSORS_CACHE_FILE}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        # Atomic swap so concurrently starting workers never read a partial file
+        os.replace(tmp_path, PROFESSORS_CACHE_FILE)
+    except OSError as e:
+        print(f"Could not write professor cache: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def load_professor_records() -> List[Dict]:
+    """Professor rows as dicts, served from the sidecar cache when it is current"""
+    try:
+        source_hash = _file_hash(PROFESSORS_FILE)
+    except OSError as e:
+        print(f"Error loading professors: {e}")
+        return []
+
+    records = _read_records_cache(source_hash)
+    if records is not None:
+        return records
+
     df = load_professors()
     if df.empty:
         return []
-    
+    _write_records_cache(source_hash, df)
+    return _read_records_cache(source_hash) or df.astype(str).to_dict('records')
+
+def normalize_name(name: str) -> str:
+    """Lowercase and collapse whitespace for name lookups"""
+    return " ".join(str(name).lower().split())
+
+def normalize_oaid(oaid: str) -> str:
+    """Short OpenAlex author ID (A123...) from either an ID or a full URL"""
+    return str(oaid).strip().rstrip('/').split('/')[-1].upper()
+
+class ProfessorRoster:
+    """The professor spreadsheet parsed once, with lookup indexes"""
+
+    def __init__(self, records: List[Dict], mtime: float = 0.0):
+        self.records = records
+        self.mtime = mtime
+        self.by_name: Dict[str, Dict] = {}
+        self.by_oaid: Dict[str, Dict] = {}
+        # Lowercased department (primary or joint) -> professors, in file order
+        self.by_department: Dict[str, List[Dict]] = {}
+
+        for record in records:
+            for column in ('emp_name', 'primary_department', 'joint_department', 'oaid'):
+                record[column] = str(record.get(column, ''))
+            self.by_name.setdefault(normalize_name(record['emp_name']), record)
+            self.by_oaid.setdefault(normalize_oaid(record['oaid']), record)
+
+            departments = {record['primary_department'].lower(), record['joint_department'].lower()}
+            for dept in departments:
+                if dept.strip():
+                    self.by_department.setdefault(dept, []).append(record)
+
+        depts = set()
+        for record in records:
+            depts.update((record['primary_department'], record['joint_department']))
+        self.departments = sorted(dept for dept in depts if dept and dept.strip())
+
+    def find_by_department(self, department: str) -> List[Dict]:
+        """Professors whose primary or joint department contains ``department``"""
+        needle = department.lower()
+        matched_depts = [dept for dept in self.by_department if needle in dept]
+        if len(matched_depts) == 1:
+            return list(self.by_department[matched_depts[0]])
+        # Several departments can contain the search text; keep file order across them
+        ids = {id(record) for dept in matched_depts for record in self.by_department[dept]}
+        return [record for record in self.records if id(record) in ids]
+
+    def find_by_name(self, name: str) -> Optional[Dict]:
+        """Exact (normalized) name match, falling back to the first partial match"""
+        key = normalize_name(name)
+        record = self.by_name.get(key)
+        if record is not None:
+            return record
+        for candidate_key, candidate in self.by_name.items():
+            if key in candidate_key:
+                return candidate
+        return None
+
+_roster: Optional[ProfessorRoster] = None
+_roster_lock = threading.Lock()
+_last_check = 0.0
+_reloading: Optional[threading.Thread] = None
+
+def _file_mtime() -> float:
+    try:
+        return os.stat(PROFESSORS_FILE).st_mtime
+    except OSError:
+        return 0.0
+
+def reload_professors() -> ProfessorRoster:
+    """Parse the spreadsheet and replace the in-memory roster (blocking)"""
+    global _roster, _last_check
+    with _roster_lock:
+        mtime = _file_mtime()
+        records = load_professor_records()
+        _roster = ProfessorRoster(records, mtime=mtime)
+        _last_check = time.monotonic()
+        print(f"✅ Loaded {len(records)} professors")
+        return _roster
+
+def _reload_in_background():
+    global _reloading
+    if _reloading is not None and _reloading.is_alive():
+        return
+    _reloading = threading.Thread(target=reload_professors, name="roster-reload", daemon=True)
+    _reloading.start()
+
+def get_roster() -> ProfessorRoster:
+    """
+    Current roster. When the spreadsheet changes on disk it is re-parsed in a
+    background thread and the previous roster is served until that finishes.
+    """
+    global _last_check
+    if _roster is None:
+        # Only before startup (e.g. scripts); the app loads it in the lifespan hook
+        return reload_professors()
+    interval = Config.PROFESSORS_RELOAD_INTERVAL
+    if interval >= 0 and time.monotonic() - _last_check >= interval:
+        _last_check = time.monotonic()
+        if _file_mtime() != _roster.mtime:
+            print("🔄 Professor spreadsheet changed on disk, reloading roster")
+            _reload_in_background()
+    return _roster
+
+def get_professors_by_department(department: str) -> List[Dict]:
+    """Get all professors in a department"""
     # Search in both primary and joint departments
-    # Convert to string first to avoid issues with NaN
-    df['primary_department'] = df['primary_department'].astype(str)
-    df['joint_department'] = df['joint_department'].astype(str)
-    
-    matches = df[
-        (df['primary_department'].str.contains(department, case=False, na=False)) |
-        (df['joint_department'].str.contains(department, case=False, na=False))
-    ]
-    
-    # Convert to dict and clean up
-    result = matches.to_dict('records')
-    return result
+    return get_roster().find_by_department(department)
 
 def get_professor_by_name(name: str) -> Optional[Dict]:
     """Get professor by name"""
-    df = load_professors()
-    if df.empty:
-        return None
-    
-    df['emp_name'] = df['emp_name'].astype(str)
-    matches = df[df['emp_name'].str.contains(name, case=False, na=False)]
-    
-    if len(matches) > 0:
-        return matches.iloc[0].to_dict()
-    return None
+    record = get_roster().find_by_name(name)
+    return dict(record) if record else None
+
+def get_professor_by_oaid(oaid: str) -> Optional[Dict]:
+    """Get professor by OpenAlex author ID or URL"""
+    record = get_roster().by_oaid.get(normalize_oaid(oaid))
+    return dict(record) if record else None
 
 def get_all_cs_professors() -> List[Dict]:
     """Get all Computer Science professors"""
@@ -57,23 +205,9 @@ def get_all_cs_professors() -> List[Dict]:
 
 def get_all_professors() -> List[Dict]:
     """Get all professors with valid OpenAlex IDs"""
-    df = load_professors()
-    if df.empty:
-        return []
-    return df.to_dict('records')
+    return list(get_roster().records)
 
 def get_all_departments() -> List[str]:
     """Get list of all unique departments"""
-    df = load_professors()
-    if df.empty:
-        return []
-    
-    # Get unique departments from both primary and joint
-    primary_depts = set(df['primary_department'].astype(str).unique())
-    joint_depts = set(df['joint_department'].astype(str).unique())
-    
-    # Combine and filter out empty strings
-    all_depts = primary_depts.union(joint_depts)
-    all_depts = [dept for dept in all_depts if dept and dept.strip()]
-    
-    return sorted(all_depts)
\ No newline at end of file
+    # Unique departments from both primary and joint, empty strings removed
+    return list(get_roster().departments)
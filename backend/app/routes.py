@@ -1,40 +1,23 @@
-from fastapi import APIRouter, HTTPException, Body
-from typing import List, Dict
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Body, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import List, Dict, Optional
+import asyncio
+import base64
+import binascii
 import json
 import re
-import os
-from pathlib import Path
-from app.ai_advisor import generate_ai_response
+from app.ai_advisor import generate_ai_response, stream_ai_response
+from app.chatbot_context import get_chatbot_context
+from app.services.catalog import get_catalog, reload_catalog
 
 router = APIRouter()
 
-# Load courses from JSON file instead of hardcoding
-def load_courses_from_json():
-    """Load courses from the processed JSON file"""
-    try:
-        # Path to the processed courses JSON file
-        json_path = Path(__file__).parent.parent / "processing_csv" / "processed_courses_2022_onwards.json"
-        
-        if not json_path.exists():
-            # Fallback to sample file if main file doesn't exist
-            json_path = Path(__file__).parent.parent / "processing_csv" / "processed_courses_sample.json"
-            if not json_path.exists():
-                print("❌ No course data files found. Run the CSV processor first.")
-                return []
-        
-        with open(json_path, 'r', encoding='utf-8') as f:
-            courses_data = json.load(f)
-        
-        print(f"✅ Loaded {len(courses_data)} courses from {json_path.name}")
-        return courses_data
-        
-    except Exception as e:
-        print(f"❌ Error loading courses from JSON: {e}")
-        return []
+SEARCH_DEFAULT_LIMIT = 50
+SEARCH_MAX_LIMIT = 500
+COURSES_MAX_LIMIT = 1000
 
-def get_all_courses():
-    """Helper function to get all courses from JSON file"""
-    return load_courses_from_json()
+# Catalog-derived lists only change on reload; browsers revalidate with the ETag
+CATALOG_CACHE_CONTROL = "public, max-age=300, must-revalidate"
 
 def enhance_course_data(course):
     """Add missing fields that were in the hardcoded data but not in processed data"""
@@ -52,37 +35,198 @@ def enhance_course_data(course):
     
     return enhanced
 
+# Fields a client may request through ``fields=`` on /api/courses/
+COURSE_FIELDS = set(enhance_course_data({
+    'id': '', 'subject': '', 'catalog_number': '', 'code': '', 'academic_group': '',
+    'academic_org': '', 'career_level': '', 'effective_year': None, 'level': '',
+    'department': '', 'title': ''
+}))
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Parse a comma-separated ``fields=`` projection, rejecting unknown names"""
+    if not fields:
+        return None
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = sorted(set(requested) - COURSE_FIELDS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown course fields: {', '.join(unknown)}")
+    return requested
+
+def project_course(course: Dict, fields: Optional[List[str]]) -> Dict:
+    """Enhanced course, reduced to ``fields`` when a projection was requested"""
+    enhanced = enhance_course_data(course)
+    if fields is None:
+        return enhanced
+    return {field: enhanced.get(field) for field in fields}
+
+def encode_cursor(version: str, offset: int) -> str:
+    """Opaque pagination cursor tied to the catalog version it was issued for"""
+    return base64.urlsafe_b64encode(f"{version}:{offset}".encode()).decode()
+
+def decode_cursor(cursor: str, version: str) -> int:
+    """Return the offset stored in ``cursor``, rejecting stale or malformed cursors"""
+    try:
+        cursor_version, offset = base64.urlsafe_b64decode(cursor.encode()).decode().rsplit(":", 1)
+        offset = int(offset)
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if cursor_version != version or offset < 0:
+        raise HTTPException(status_code=410, detail="Cursor expired: course data was reloaded")
+    return offset
+
+def cached_json_response(request: Request, etag: str, build_payload) -> Response:
+    """Serve ``build_payload()`` with an ETag, or an empty 304 if the client's copy is current"""
+    headers = {"ETag": etag, "Cache-Control": CATALOG_CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(build_payload(), headers=headers)
+
+def wants_event_stream(http_request: Request, body: dict) -> bool:
+    """Clients opt into server-sent events with {"stream": true} or Accept: text/event-stream"""
+    return bool(body.get("stream")) or "text/event-stream" in http_request.headers.get("accept", "")
+
+def sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def sse_response(events) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        # Stop proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+def relay_ai_stream(first: Dict, events, finish) -> StreamingResponse:
+    """
+    Relay events from ``stream_ai_response`` as SSE: 'start' with the model,
+    one 'token' per text chunk, then 'done' carrying ``finish(text, model)``,
+    the same payload the non-streamed endpoint returns. The caller awaits the
+    first event itself so failures before any output stay ordinary HTTP errors.
+    """
+    async def relay():
+        model = None
+        parts = []
+        try:
+            event = first
+            while True:
+                if "model" in event:
+                    model = event["model"]
+                    yield sse_event("start", {"model": model})
+                if "text" in event:
+                    parts.append(event["text"])
+                    yield sse_event("token", {"text": event["text"]})
+                event = await events.__anext__()
+        except StopAsyncIteration:
+            pass
+        except Exception as e:
+            # Headers are already sent; report the failure in-band
+            yield sse_event("error", {"detail": getattr(e, "detail", None) or str(e) or type(e).__name__, "partial": "".join(parts)})
+            return
+        yield sse_event("done", finish("".join(parts), model))
+
+    return sse_response(relay())
+
+def parse_ai_result(result):
+    """Return JSON embedded in a model answer (e.g. career recommendations) as structured data"""
+    text = None
+    if isinstance(result, dict):
+        text = result.get('result')
+    elif isinstance(result, str):
+        text = result
+
+    if text:
+        # Try to parse JSON blob from the text
+        try:
+            parsed = json.loads(text)
+            # If parsed is a dict and contains career recommendation keys, return it as structured JSON
+            if isinstance(parsed, dict):
+                return parsed
+            # otherwise return as-is
+            return {"result": parsed, "model": result.get('model') if isinstance(result, dict) else None}
+        except Exception:
+            # Not a plain JSON body; try to extract JSON substring
+            try:
+                m = re.search(r"\{.*\}", text, re.DOTALL)
+                if m:
+                    parsed = json.loads(m.group())
+                    if isinstance(parsed, dict):
+                        return parsed
+            except Exception:
+                pass
+
+    return result
+
 @router.get("/api/ai/models")
 async def list_ai_models():
     """Return available AI models from the configured Google client for debugging."""
-    try:
-        import google.generativeai as genai
-        from app.config import Config
+    from app.ai_advisor import model_registry
+    from app.config import Config
 
-        if not Config.GOOGLE_API_KEY:
-            raise HTTPException(status_code=400, detail="GOOGLE_API_KEY not configured on server")
+    if not Config.GOOGLE_API_KEY:
+        raise HTTPException(status_code=400, detail="GOOGLE_API_KEY not configured on server")
 
-        genai.configure(api_key=Config.GOOGLE_API_KEY)
-        models = genai.list_models()
-        return {"models": models}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    await model_registry.refresh_if_stale()
+    status = model_registry.status()
+    return {"models": status["available"], **status}
+
+@router.get("/api/catalog/")
+async def catalog_status():
+    """Report which version of the course data is currently being served"""
+    return get_catalog().info()
+
+@router.post("/api/catalog/reload")
+async def catalog_reload():
+    """Re-read the course data file without restarting the server"""
+    return (await reload_catalog()).info()
 
 @router.get("/api/courses/")
-async def list_courses():
-    """Get all courses from JSON file"""
-    courses = get_all_courses()
-    enhanced_courses = [enhance_course_data(course) for course in courses]
-    return {"courses": enhanced_courses, "total": len(enhanced_courses)}
+async def list_courses(
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=COURSES_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+):
+    """Get courses from the catalog.
+
+    Without ``limit`` the whole catalog is returned (the original behaviour).
+    With ``limit`` one page is returned along with ``next_cursor``; pass it
+    back as ``cursor`` to fetch the following page. ``fields`` projects each
+    course to a comma-separated list of keys. ``format=ndjson`` streams one
+    course per line instead of building a single JSON document; paging
+    metadata is then sent in ``X-Total-Count``/``X-Next-Cursor`` headers.
+    """
+    snapshot = get_catalog()
+    projection = parse_fields(fields)
+    if cursor:
+        offset = decode_cursor(cursor, snapshot.version)
+
+    total = len(snapshot.courses)
+    end = total if limit is None else min(offset + limit, total)
+    next_cursor = encode_cursor(snapshot.version, end) if end < total else None
+
+    if format == "ndjson":
+        def stream():
+            # Reads from the captured snapshot, so a reload mid-stream can't mix versions
+            for i in range(offset, end):
+                yield json.dumps(project_course(snapshot.courses[i], projection)) + "\n"
+
+        headers = {"X-Total-Count": str(total), "X-Catalog-Version": snapshot.version}
+        if next_cursor:
+            headers["X-Next-Cursor"] = next_cursor
+        return StreamingResponse(stream(), media_type="application/x-ndjson", headers=headers)
+
+    courses = [project_course(course, projection) for course in snapshot.courses[offset:end]]
+    response = {"courses": courses, "total": total}
+    if limit is not None or offset or cursor:
+        response.update({"offset": offset, "limit": limit, "next_cursor": next_cursor})
+    return response
 
 @router.get("/api/courses/{course_id}")
 async def get_course(course_id: str):
-    """Get a specific course by ID"""
-    courses = get_all_courses()
-    course = next((c for c in courses if c["id"] == course_id), None)
-    if not course:
-        # Also try searching by code as fallback
-        course = next((c for c in courses if c.get("code") == course_id), None)
+    """Get a specific course by ID (or course code as fallback)"""
+    course = get_catalog().get_course(course_id)
     
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
@@ -90,86 +234,56 @@ async def get_course(course_id: str):
     return enhance_course_data(course)
 
 @router.get("/api/courses/search/")
-async def search_courses(q: str = "", department: str = None, level: str = None):
-    """Search courses by query with optional filters"""
-    courses = get_all_courses()
-    
-    if not q and not department and not level:
-        enhanced_courses = [enhance_course_data(course) for course in courses]
-        return {"courses": enhanced_courses, "total": len(enhanced_courses)}
-    
-    query = q.lower() if q else ""
-    results = []
-    
-    for course in courses:
-        # Text search
-        text_match = True
-        if query:
-            text_match = (
-                query in course.get("code", "").lower() or
-                query in course.get("title", "").lower() or
-                query in course.get("subject", "").lower() or
-                query in course.get("catalog_number", "").lower() or
-                query in course.get("department", "").lower()
-            )
-        
-        # Department filter
-        dept_match = True
-        if department:
-            dept_match = (
-                department.lower() in course.get("department", "").lower() or
-                department.lower() in course.get("academic_group", "").lower() or
-                department.lower() in course.get("academic_org", "").lower()
-            )
-        
-        # Level filter
-        level_match = True
-        if level:
-            level_match = level.lower() in course.get("level", "").lower()
-        
-        if text_match and dept_match and level_match:
-            results.append(enhance_course_data(course))
+async def search_courses(
+    q: str = "",
+    department: str = None,
+    level: str = None,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(SEARCH_DEFAULT_LIMIT, ge=1, le=SEARCH_MAX_LIMIT),
+):
+    """Search courses by query with optional filters.
+
+    Results are ranked (exact code, then code prefix, then word and substring
+    matches) and paginated with ``offset``/``limit``; ``total`` is the number
+    of matches across all pages and ``facets`` holds per-value counts for
+    department, academic group/org and level over those matches.
+    """
+    snapshot = get_catalog()
+    within = snapshot.facets.filter(department=department, level=level)
+    doc_ids = snapshot.search_index.match(q, within)
+    page = [snapshot.courses[doc_id] for doc_id in doc_ids[offset:offset + limit]]
+    
+    # Facet counts over the full result set (precomputed when nothing is filtered)
+    unfiltered = not q.strip() and within is None
+    facets = snapshot.facets.counts(None if unfiltered else doc_ids)
     
-    return {"courses": results, "total": len(results)}
+    return {
+        "courses": [enhance_course_data(course) for course in page],
+        "total": len(doc_ids),
+        "offset": offset,
+        "limit": limit,
+        "facets": facets,
+    }
 
 @router.get("/api/departments/")
-async def list_departments():
+async def list_departments(request: Request):
     """Get all unique departments"""
-    courses = get_all_courses()
-    departments = set()
-    
-    for course in courses:
-        dept = course.get('department')
-        if dept and dept != '':
-            departments.add(dept)
-        # Also include academic org and group as departments
-        org = course.get('academic_org')
-        if org and org != '':
-            departments.add(org)
-        group = course.get('academic_group')
-        if group and group != '':
-            departments.add(group)
-    
-    return {"departments": sorted(list(departments))}
+    snapshot = get_catalog()
+    return cached_json_response(request, snapshot.etag("departments"),
+                                lambda: {"departments": snapshot.departments})
 
 @router.get("/api/subjects/")
-async def list_subjects():
+async def list_subjects(request: Request):
     """Get all unique subjects"""
-    courses = get_all_courses()
-    subjects = set()
-    
-    for course in courses:
-        subject = course.get('subject')
-        if subject and subject != '':
-            subjects.add(subject)
-    
-    return {"subjects": sorted(list(subjects))}
+    snapshot = get_catalog()
+    return cached_json_response(request, snapshot.etag("subjects"),
+                                lambda: {"subjects": snapshot.subjects})
 
 # AI Advisor endpoint
 @router.post("/api/ai-advisor/")
 async def ai_career_advisor(request: dict):
     """AI-powered career advisor"""
-    from app.ai_advisor import get_career_recommendations
+    from app.career_cache import get_cached_recommendations
 
     career_goal = request.get("career_goal", "")
     major = request.get("major", "Computer Science")
@@ -177,32 +291,58 @@ async def ai_career_advisor(request: dict):
     if not career_goal:
         raise HTTPException(status_code=400, detail="Career goal is required")
     
-    courses = get_all_courses()
-    recommendations = get_career_recommendations(
-        career_goal=career_goal,
-        available_courses=courses,
-        current_major=major
-    )
-    
-    return recommendations
+    # Repeated goals (e.g. the preset career paths) are served from cache
+    return await get_cached_recommendations(career_goal, major)
 
 # Professor endpoints
+_warming_departments = set()
+
+async def warm_professor_cache(department: str, professors: List[Dict]):
+    """Background job: batch-fetch OpenAlex profiles for a department's professors"""
+    from app.openalex_service import get_authors_batch
+    
+    key = department.lower()
+    if key in _warming_departments:
+        return
+    _warming_departments.add(key)
+    try:
+        authors = await get_authors_batch([p.get('oaid', '') for p in professors])
+        print(f"🔥 Warmed OpenAlex cache for {len(authors)}/{len(professors)} professors in {department}")
+    finally:
+        _warming_departments.discard(key)
+
 @router.get("/api/professors/")
-async def get_professors(department: str = None):
+async def get_professors(background_tasks: BackgroundTasks, department: str = None):
     """Get all professors, optionally filtered by department"""
     from app.professor_data import get_all_professors, get_professors_by_department
     
     if department and department.lower() != "all":
         professors = get_professors_by_department(department)
+        # Professors in a listed department are likely to be opened next
+        background_tasks.add_task(warm_professor_cache, department, professors)
     else:
         # Return ALL professors from all departments
         professors = get_all_professors()
     
     return {"professors": professors, "total": len(professors)}
 
+@router.post("/api/professors/prefetch", status_code=202)
+async def prefetch_professors(background_tasks: BackgroundTasks, request: dict = Body(default={})):
+    """Schedule an OpenAlex cache warm-up for a department (or "all")"""
+    from app.professor_data import get_all_professors, get_professors_by_department
+    
+    department = request.get("department") or "all"
+    if department.lower() == "all":
+        professors = get_all_professors()
+    else:
+        professors = get_professors_by_department(department)
+    
+    background_tasks.add_task(warm_professor_cache, department, professors)
+    return {"status": "scheduled", "department": department, "professors": len(professors)}
+
 @router.post("/api/gemini/")
-async def gemini_endpoint(body: dict = Body(...)):
-    """Handle requests to the Gemini AI model."""
+async def gemini_endpoint(http_request: Request, body: dict = Body(...)):
+    """Handle requests to the Gemini AI model; streams SSE when the client asks for it."""
     prompt = body.get('prompt')
     if not prompt:
         raise HTTPException(status_code=400, detail="Prompt is required")
@@ -210,47 +350,88 @@ async def gemini_endpoint(body: dict = Body(...)):
     model = body.get('model')  # optional
     # Log incoming prompt for debugging (avoid logging sensitive data in production)
     print(f"/api/gemini/ called; model={model}")
+
+    if wants_event_stream(http_request, body):
+        events = stream_ai_response(prompt, model)
+        first = await events.__anext__()
+        # JSON extraction runs on the complete text once the stream ends
+        return relay_ai_stream(
+            first, events,
+            lambda text, used_model: parse_ai_result({"result": text.strip(), "model": used_model})
+        )
+
     result = await generate_ai_response(prompt, model)
 
     # `generate_ai_response` returns {'result': text, ...} on success.
     # If the text itself contains JSON (e.g., career recommendation JSON), parse and return it
-    text = None
-    if isinstance(result, dict):
-        text = result.get('result')
-    elif isinstance(result, str):
-        text = result
+    return parse_ai_result(result)
 
-    if text:
-        # Try to parse JSON blob from the text
-        try:
-            parsed = json.loads(text)
-            # If parsed is a dict and contains career recommendation keys, return it as structured JSON
-            if isinstance(parsed, dict):
-                return parsed
-            # otherwise return as-is
-            return {"result": parsed, "model": result.get('model') if isinstance(result, dict) else None}
-        except Exception:
-            # Not a plain JSON body; try to extract JSON substring
-            try:
-                m = re.search(r"\{.*\}", text, re.DOTALL)
-                if m:
-                    parsed = json.loads(m.group())
-                    if isinstance(parsed, dict):
-                        return parsed
-            except Exception:
-                pass
+# Co-authorship graph endpoints (built from the offline OpenAlex snapshot)
+def _professor_author_id(professor_name: str) -> tuple:
+    from app.professor_data import get_professor_by_name
+    from app.openalex_service import short_author_id
+    
+    professor = get_professor_by_name(professor_name)
+    if not professor:
+        raise HTTPException(status_code=404, detail=f"Professor not found: {professor_name}")
+    if not professor.get('oaid'):
+        raise HTTPException(status_code=400, detail="Professor has no OpenAlex ID")
+    return professor, short_author_id(professor['oaid'])
+
+@router.get("/api/coauthor-graph/")
+async def coauthor_graph_stats():
+    """Size of the precomputed faculty co-authorship graph"""
+    from app.coauthor_graph import get_coauthor_graph
+    return get_coauthor_graph().stats()
+
+@router.get("/api/coauthor-graph/path")
+async def coauthor_path(source: str, target: str):
+    """Shortest chain of BU co-authors linking two professors"""
+    from app.coauthor_graph import get_coauthor_graph
+    
+    graph = get_coauthor_graph()
+    _, source_id = _professor_author_id(source)
+    _, target_id = _professor_author_id(target)
+    path = graph.shortest_path(source_id, target_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="No collaboration path found")
+    
+    return {
+        "path": [
+            {"id": author_id, "name": graph.faculty[author_id].get('emp_name', '')}
+            for author_id in path
+        ],
+        "hops": len(path) - 1
+    }
 
-    return result
+@router.get("/api/coauthor-graph/{professor_name}")
+async def professor_collaborators(professor_name: str, limit: int = Query(10, ge=1, le=100)):
+    """Top collaborators and BU-internal collaborators of a professor"""
+    from app.coauthor_graph import get_coauthor_graph
+    
+    graph = get_coauthor_graph()
+    professor, author_id = _professor_author_id(professor_name)
+    if author_id not in graph:
+        raise HTTPException(status_code=404, detail="Professor is not in the co-author graph")
+    
+    return {
+        "professor": professor,
+        "coauthors": graph.top_collaborators(author_id, limit),
+        "bu_collaborators": graph.internal_collaborators(author_id, limit)
+    }
 
 @router.get("/api/professors/{professor_name}")
 async def get_professor_details(professor_name: str):
     """Get detailed professor information including OpenAlex data"""
     from app.professor_data import get_professor_by_name
+    from app.coauthor_graph import get_coauthor_graph
     from app.openalex_service import (
+        COAUTHOR_WORKS_WINDOW,
         get_author_data,
         get_author_works,
         get_coauthors,
-        generate_research_summary
+        generate_research_summary,
+        short_author_id
     )
     
     professor = get_professor_by_name(professor_name)
@@ -259,9 +440,24 @@ async def get_professor_details(professor_name: str):
     
     oaid = professor.get('oaid', '')
     if oaid:
-        author_data = get_author_data(oaid)
-        works = get_author_works(oaid, limit=10)
-        coauthors = get_coauthors(oaid, limit=10)
+        graph = get_coauthor_graph()
+        author_id = short_author_id(oaid)
+        if author_id in graph:
+            # Collaborators are precomputed; only the profile and recent works are needed
+            author_data, works = await asyncio.gather(
+                get_author_data(oaid),
+                get_author_works(oaid, limit=10),
+            )
+            coauthors = graph.top_collaborators(author_id, limit=10)
+        else:
+            # Author profile and works are fetched concurrently; one works fetch
+            # feeds both the recent-works list and the co-author counts
+            author_data, recent = await asyncio.gather(
+                get_author_data(oaid),
+                get_author_works(oaid, limit=COAUTHOR_WORKS_WINDOW),
+            )
+            works = recent[:10]
+            coauthors = await get_coauthors(oaid, limit=10, works=recent)
         
         if author_data:
             research_summary = generate_research_summary(author_data, works)
@@ -276,17 +472,10 @@ async def get_professor_details(professor_name: str):
     
     return {"professor": professor}
 
-@router.post("/api/professors/cold-email")
-async def generate_professor_email(request: dict):
-    """Generate personalized cold email to professor"""
+def _cold_email_request(request: dict):
+    """Validate a cold-email request; returns (professor, interests, course context)"""
     from app.professor_data import get_professor_by_name
-    from app.openalex_service import (
-        get_author_data,
-        get_author_works,
-        generate_research_summary,
-        generate_cold_email
-    )
-    
+
     professor_name = request.get("professor_name", "")
     student_interests = request.get("student_interests", "")
     course_context = request.get("course_context", "")
@@ -295,34 +484,63 @@ async def generate_professor_email(request: dict):
     if not professor:
         raise HTTPException(status_code=404, detail="Professor not found")
     
-    oaid = professor.get('oaid', '')
-    if not oaid:
+    if not professor.get('oaid', ''):
         raise HTTPException(status_code=400, detail="Professor has no OpenAlex ID")
-    
-    author_data = get_author_data(oaid)
-    works = get_author_works(oaid, limit=10)
-    
-    if not author_data:
-        raise HTTPException(status_code=500, detail="Could not fetch research data")
-    
-    research_summary = generate_research_summary(author_data, works)
-    
-    email = generate_cold_email(
-        professor_name=professor_name,
-        research_summary=research_summary,
-        student_interests=student_interests,
-        course_context=course_context
-    )
-    
+
+    return professor, student_interests, course_context
+
+def _submit_cold_email(request: dict):
+    from app.cold_email import submit_cold_email
+    from app.services.jobs import QueueFull
+
+    try:
+        return submit_cold_email(*_cold_email_request(request))
+    except QueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "10"})
+
+@router.post("/api/professors/cold-email/jobs", status_code=202)
+async def submit_professor_email(request: dict):
+    """Queue a cold email; poll the returned status URL for the result"""
+    job = _submit_cold_email(request)
     return {
-        "email": email,
-        "professor": professor_name,
-        "research_areas": [c.get('display_name') for c in author_data.get('x_concepts', [])[:5]]
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/api/professors/cold-email/jobs/{job.id}",
     }
 
+@router.get("/api/professors/cold-email/jobs")
+async def professor_email_queue_status():
+    """Cold-email queue status: worker count and number of jobs in each state"""
+    from app.cold_email import cold_email_jobs
+
+    return cold_email_jobs.stats()
+
+@router.get("/api/professors/cold-email/jobs/{job_id}")
+async def get_professor_email_job(job_id: str):
+    """Status of a cold-email job, with the email once it is done"""
+    from app.cold_email import cold_email_jobs
+
+    job = cold_email_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job.to_dict()
+
+@router.post("/api/professors/cold-email")
+async def generate_professor_email(request: dict):
+    """Generate personalized cold email to professor (waits for the background job)"""
+    from app.cold_email import RESEARCH_UNAVAILABLE, cold_email_jobs
+
+    job = await cold_email_jobs.wait(_submit_cold_email(request))
+    if job.error == RESEARCH_UNAVAILABLE:
+        raise HTTPException(status_code=500, detail=RESEARCH_UNAVAILABLE)
+    if job.error:
+        # Same shape as a successful answer, with the error text as the email
+        return {"email": job.error, "professor": job.payload["professor_name"], "research_areas": []}
+    return job.result
+
 @router.post("/api/chatbot/")
-async def chatbot_conversation(request: dict):
-    """AI chatbot for course planning assistance"""
+async def chatbot_conversation(request: dict, http_request: Request):
+    """AI chatbot for course planning assistance; streams SSE when the client asks for it"""
     from app.config import Config
     
     user_message = request.get("message", "")
@@ -331,58 +549,9 @@ async def chatbot_conversation(request: dict):
     if not user_message:
         raise HTTPException(status_code=400, detail="Message is required")
     
-    courses = get_all_courses()
-    course_count = len(courses)
-    
-    # Get sample departments and subjects for better responses
-    departments = set()
-    for course in courses[:50]:  # Sample first 50 courses
-        if dept := course.get('department'):
-            departments.add(dept)
-    dept_list = ", ".join(sorted(list(departments))[:10])
-    
-    website_knowledge = f"""
-WEBSITE STRUCTURE & NAVIGATION:
-The BU Course Planner has 5 main sections accessible from the top navigation bar:
-
-1. HOME (/) - Landing page with overview and quick access buttons
-2. EXPLORER (/explorer) - Browse and search {course_count} BU courses with filters
-3. PLANNER (/planner) - Drag-and-drop semester planning with PDF export
-4. PROGRESS (/progress) - AI career advisor for personalized course recommendations
-5. PROFESSORS (/professors) - Research faculty publications and generate cold emails
-
-KEY FEATURES & HOW TO USE THEM:
-
-📚 COURSE SEARCH (Explorer page):
-- Use the search bar to find courses by name, code, or keyword
-- Filter by department: {dept_list}, and more
-- Filter by level: Introductory, Intermediate, Advanced, Graduate
-- Click any course card to see full details
-
-📅 SEMESTER PLANNING (Planner page):
-- Click "Add Semester" button to create a new semester
-- Drag courses from the left sidebar into semester boards
-- Prerequisites are validated automatically
-- Export your plan to PDF with the "Export to PDF" button
-- Visual prerequisite flow shows course dependencies
-
-🎯 CAREER ADVISOR (Progress page):
-- Choose from preset career paths OR enter a custom career goal
-- AI analyzes your goal and recommends optimal courses
-- See required skills and skill coverage percentage
-- Click "Get Recommendations" to get AI-powered advice
-
-👨‍🏫 PROFESSOR RESEARCH (Professors page):
-- Browse all BU professors by department
-- Click a professor's name to see their research and publications
-- View research areas from OpenAlex database
-- Generate AI-powered professional cold emails
-
-NAVIGATION TIPS:
-- All main pages are accessible from the top navigation bar
-- Home page has quick action buttons for each feature
-- Use the chatbot (me!) anytime for help navigating
-"""
+    # Built once per catalog version
+    chatbot_context = get_chatbot_context()
+    course_count = chatbot_context.course_count
     
     # Provide rule-based responses for common questions when API is not available
     def get_fallback_response(message: str) -> str:
@@ -425,38 +594,40 @@ What would you like to do? I can give you specific directions!"""
 
 What would you like help with? Ask me about finding courses, planning semesters, career recommendations, or researching professors!"""
     
-    # Check if API key is configured
-    if not Config.GOOGLE_API_KEY:
-        # Provide helpful fallback response
-        fallback = get_fallback_response(user_message)
-        return {
-            "response": fallback,
+    stream = wants_event_stream(http_request, request)
+
+    def fallback_reply():
+        payload = {
+            "response": get_fallback_response(user_message),
             "model": "fallback",
             "message": user_message
         }
+        if stream:
+            return sse_response(iter([sse_event("done", payload)]))
+        return payload
+
+    # Check if API key is configured
+    if not Config.GOOGLE_API_KEY:
+        # Provide helpful fallback response
+        return fallback_reply()
     
     # Use AI if API key is available
-    from app.ai_advisor import generate_ai_response
+    from app.ai_advisor import generate_ai_response, stream_ai_response
     
-    context = f"""You are an AI assistant for the BU Course Planner website. You help Boston University students with course planning and navigating the website.
-
-{website_knowledge}
-
-Previous conversation:
-{chr(10).join([f"{msg['role']}: {msg['content']}" for msg in chat_history[-5:]])}
-
-Current user question: {user_message}
-
-INSTRUCTIONS:
-- Be helpful, friendly, and conversational
-- Give specific navigation directions (e.g., "Click on 'Explorer' in the top menu")
-- Reference the exact page names and button labels from the website structure above
-- Suggest relevant features based on user needs
-- Keep responses concise (2-4 sentences) but informative
-- Use emojis sparingly for visual appeal
-- If asked about courses, mention that there are {course_count} courses available
-- Guide users to the right page for their needs with clear step-by-step directions"""
+    context = chatbot_context.build_prompt(user_message, chat_history)
     
+    if stream:
+        events = stream_ai_response(context)
+        try:
+            first = await events.__anext__()
+        except Exception:
+            # If AI fails before saying anything, use fallback
+            return fallback_reply()
+        return relay_ai_stream(
+            first, events,
+            lambda text, model: {"response": text, "model": model, "message": user_message}
+        )
+
     try:
         response = await generate_ai_response(context)
         return {
@@ -466,9 +637,4 @@ INSTRUCTIONS:
         }
     except Exception as e:
         # If AI fails, use fallback
-        fallback = get_fallback_response(user_message)
-        return {
-            "response": fallback,
-            "model": "fallback",
-            "message": user_message
-        }
\ No newline at end of file
+        return fallback_reply()
\ No newline at end of file
@@ -0,0 +1,212 @@
+"""Two-tier (memory + SQLite) cache for JSON-serializable upstream responses.
+
+The memory tier is a small per-process LRU; the disk tier is a SQLite file
+shared by every worker and surviving restarts. Entries carry the time they
+were stored, and callers decide what "fresh" and "stale" mean via ``ttl`` and
+``stale_ttl``: fresh entries are served as-is, stale ones can be served while
+a refresh happens, and anything older is treated as missing.
+
+The event loop never touches SQLite: disk reads run in a worker thread
+(``get``/``get_many`` are coroutines), and writes, deletes and access-time
+updates are queued for a single writer thread that commits them in batches.
+"""
+import asyncio
+import atexit
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Disk operations queued for the writer thread
+_SET = "set"
+_TOUCH = "touch"
+_DELETE = "delete"
+
+# Rows written between pruning passes
+PRUNE_EVERY = 50
+
+
+class CacheEntry:
+    def __init__(self, value: Any, stored_at: float):
+        self.value = value
+        self.stored_at = stored_at
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.stored_at
+
+
+class TieredCache:
+    """In-process LRU in front of a size-bounded SQLite table"""
+
+    def __init__(self, path: Optional[str], ttl: float, stale_ttl: float = 0,
+                 max_memory_entries: int = 512, max_disk_entries: int = 5000):
+        self.path = path
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self._memory: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        # _lock guards the memory tier, _db_lock the SQLite connection
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._writes: "queue.Queue[Tuple]" = queue.Queue()
+        self._writes_since_prune = 0
+        if path:
+            self._open_db(path)
+        if self._db is not None:
+            threading.Thread(target=self._writer, name="cache-writer", daemon=True).start()
+            # Queued writes still reach disk when a CLI run exits
+            atexit.register(self.flush)
+
+    def _open_db(self, path: str):
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False, timeout=5)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+                " stored_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)")
+            self._db.commit()
+        except sqlite3.Error as e:
+            print(f"⚠️  Disk cache at {path} unavailable, using memory only: {e}")
+            self._db = None
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        return entry.age < self.ttl
+
+    def _usable(self, entry: CacheEntry) -> bool:
+        return entry.age < self.ttl + self.stale_ttl
+
+    def _remember(self, key: str, entry: CacheEntry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _from_memory(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            if self._usable(entry):
+                self._memory.move_to_end(key)
+                return entry
+            del self._memory[key]
+            return None
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        """Fresh or stale entry for ``key``; None if missing or past its stale window"""
+        return (await self.get_many([key])).get(key)
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, CacheEntry]:
+        """Usable entries for ``keys``; memory misses are read from disk in one worker-thread call"""
+        found = {}
+        missing = []
+        for key in keys:
+            entry = self._from_memory(key)
+            if entry is not None:
+                found[key] = entry
+            else:
+                missing.append(key)
+        if missing and self._db is not None:
+            found.update(await asyncio.to_thread(self._read_disk, missing))
+        return found
+
+    def _read_disk(self, keys: List[str]) -> Dict[str, CacheEntry]:
+        found = {}
+        now = time.time()
+        for key in keys:
+            try:
+                with self._db_lock:
+                    row = self._db.execute(
+                        "SELECT value, stored_at FROM entries WHERE key = ?", (key,)
+                    ).fetchone()
+                if row is None:
+                    continue
+                entry = CacheEntry(json.loads(row[0]), row[1])
+            except (sqlite3.Error, ValueError) as e:
+                print(f"Cache read failed for {key}: {e}")
+                continue
+            if not self._usable(entry):
+                self._writes.put((_DELETE, key))
+                continue
+            # Access times only order LRU pruning, so they are written later in a batch
+            self._writes.put((_TOUCH, key, now))
+            with self._lock:
+                self._remember(key, entry)
+            found[key] = entry
+        return found
+
+    def set(self, key: str, value: Any):
+        """Store ``value`` in memory now and queue it for the disk tier"""
+        now = time.time()
+        with self._lock:
+            self._remember(key, CacheEntry(value, now))
+        if self._db is None:
+            return
+        try:
+            # Serialized here so later changes to ``value`` don't leak into the stored copy
+            self._writes.put((_SET, key, json.dumps(value), now))
+        except (TypeError, ValueError) as e:
+            print(f"Cache write failed for {key}: {e}")
+
+    def flush(self):
+        """Block until every queued disk write has been committed"""
+        if self._db is not None:
+            self._writes.join()
+
+    def _writer(self):
+        """Commit queued operations, one transaction per batch"""
+        while True:
+            batch = [self._writes.get()]
+            while True:
+                try:
+                    batch.append(self._writes.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._apply(batch)
+            except sqlite3.Error as e:
+                print(f"Cache write failed for {len(batch)} entries: {e}")
+            finally:
+                for _ in batch:
+                    self._writes.task_done()
+
+    def _apply(self, batch: List[Tuple]):
+        rows = [op[1:] + (op[3],) for op in batch if op[0] == _SET]
+        touches = [(op[2], op[1]) for op in batch if op[0] == _TOUCH]
+        deletes = [(op[1],) for op in batch if op[0] == _DELETE]
+        with self._db_lock:
+            if deletes:
+                self._db.executemany("DELETE FROM entries WHERE key = ?", deletes)
+            if rows:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO entries (key, value, stored_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+            if touches:
+                self._db.executemany("UPDATE entries SET accessed_at = ? WHERE key = ?", touches)
+            self._writes_since_prune += len(rows)
+            if self._writes_since_prune >= PRUNE_EVERY:
+                self._prune()
+            self._db.commit()
+
+    def _prune(self):
+        """Drop expired rows, then least recently used rows beyond the size bound"""
+        self._writes_since_prune = 0
+        cutoff = time.time() - (self.ttl + self.stale_ttl)
+        self._db.execute("DELETE FROM entries WHERE stored_at < ?", (cutoff,))
+        self._db.execute(
+            "DELETE FROM entries WHERE key IN ("
+            " SELECT key FROM entries ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_disk_entries,),
+        )
@@ -0,0 +1,218 @@
+"""Process-wide, in-memory course catalog.
+
+The processed course JSON is parsed once (at startup, via the FastAPI lifespan
+hook) into an immutable ``CatalogSnapshot``. Handlers read the current snapshot
+through ``get_catalog()``; a reload builds a new snapshot and swaps it in, so a
+request never sees a half-built catalog. Building a snapshot takes about a
+second, so reloads triggered from the event loop run in a worker thread while
+requests keep reading the previous snapshot.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from functools import cached_property
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from app.config import Config
+from app.services.facets import CourseFacets
+from app.services.retrieval import CourseRetriever
+from app.services.search import CourseSearchIndex
+from app.utils.text import normalize_code
+
+DATA_DIR = Path(__file__).parent.parent.parent / "processing_csv"
+CATALOG_FILE = DATA_DIR / "processed_courses_2022_onwards.json"
+SAMPLE_FILE = DATA_DIR / "processed_courses_sample.json"
+
+
+def resolve_catalog_path() -> Optional[Path]:
+    """Return the course data file to serve, falling back to the sample file"""
+    if CATALOG_FILE.exists():
+        return CATALOG_FILE
+    if SAMPLE_FILE.exists():
+        return SAMPLE_FILE
+    return None
+
+
+class CatalogSnapshot:
+    """One loaded version of the course data file"""
+
+    def __init__(self, courses: List[Dict], path: Optional[Path] = None,
+                 mtime: float = 0.0, version: str = "empty"):
+        self.courses = courses
+        self.path = path
+        self.mtime = mtime
+        # Content hash of the source file; changes whenever the data changes
+        self.version = version
+        self.loaded_at = time.time()
+        self._build_lookup_indexes()
+        self.search_index = CourseSearchIndex(courses)
+        self.facets = CourseFacets(courses)
+        self._build_lists()
+
+    def _build_lookup_indexes(self):
+        """Index courses by id, normalized code and (subject, catalog number).
+
+        Codes are not unique across course ids, so the first course wins to
+        match the order a linear scan would have returned.
+        """
+        self.by_id: Dict[str, Dict] = {}
+        self.by_code: Dict[str, Dict] = {}
+        self.by_subject_catalog: Dict[Tuple[str, str], Dict] = {}
+
+        for course in self.courses:
+            course_id = str(course.get("id", ""))
+            if course_id:
+                self.by_id.setdefault(course_id, course)
+            code = course.get("code")
+            if code:
+                self.by_code.setdefault(normalize_code(code), course)
+            subject = course.get("subject")
+            catalog_number = course.get("catalog_number")
+            if subject and catalog_number:
+                key = (normalize_code(subject), normalize_code(catalog_number))
+                self.by_subject_catalog.setdefault(key, course)
+
+    def _build_lists(self):
+        """Sorted department and subject lists served by /api/departments/ and /api/subjects/"""
+        departments = set()
+        subjects = set()
+        for course in self.courses:
+            # Academic org and group are also offered as departments
+            for field in ("department", "academic_org", "academic_group"):
+                if value := course.get(field):
+                    departments.add(value)
+            if subject := course.get("subject"):
+                subjects.add(subject)
+        self.departments: List[str] = sorted(departments)
+        self.subjects: List[str] = sorted(subjects)
+
+    @cached_property
+    def retriever(self) -> CourseRetriever:
+        """BM25 index for prompt building, built on first use since only the AI advisor needs it"""
+        return CourseRetriever(self.courses)
+
+    def etag(self, resource: str) -> str:
+        """Strong ETag for a resource derived from this catalog version"""
+        return f'"{self.version}-{resource}"'
+
+    def get_course(self, key: str) -> Optional[Dict]:
+        """Look up a course by id, falling back to its course code"""
+        course = self.by_id.get(key)
+        if course is None:
+            course = self.by_code.get(normalize_code(key))
+        return course
+
+    def get_course_by_subject(self, subject: str, catalog_number: str) -> Optional[Dict]:
+        """Look up a course by subject and catalog number"""
+        return self.by_subject_catalog.get((normalize_code(subject), normalize_code(catalog_number)))
+
+    def __len__(self) -> int:
+        return len(self.courses)
+
+    def info(self) -> Dict:
+        return {
+            "source": self.path.name if self.path else None,
+            "version": self.version,
+            "total": len(self.courses),
+            "loaded_at": self.loaded_at,
+        }
+
+
+def load_snapshot(path: Optional[Path]) -> CatalogSnapshot:
+    """Read and parse a course data file into a snapshot"""
+    if path is None:
+        print("❌ No course data files found. Run the CSV processor first.")
+        return CatalogSnapshot([])
+
+    stat = path.stat()
+    raw = path.read_bytes()
+    courses = json.loads(raw.decode("utf-8"))
+    version = hashlib.sha1(raw).hexdigest()[:16]
+
+    print(f"✅ Loaded {len(courses)} courses from {path.name} (version {version})")
+    return CatalogSnapshot(courses, path=path, mtime=stat.st_mtime, version=version)
+
+
+class CourseCatalog:
+    """Holds the current catalog snapshot and hot-reloads it when the file changes"""
+
+    def __init__(self, check_interval: float = Config.CATALOG_RELOAD_INTERVAL):
+        self.check_interval = check_interval
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        self._reloading: Optional[threading.Thread] = None
+
+    def load(self) -> CatalogSnapshot:
+        """(Re)load the catalog from disk and make it current (blocking)"""
+        with self._lock:
+            path = resolve_catalog_path()
+            try:
+                snapshot = load_snapshot(path)
+            except Exception as e:
+                print(f"❌ Error loading courses from JSON: {e}")
+                # Keep serving the previous version if we had one
+                if self._snapshot is not None:
+                    return self._snapshot
+                snapshot = CatalogSnapshot([])
+            self._snapshot = snapshot
+            self._last_check = time.monotonic()
+            return snapshot
+
+    async def reload(self) -> CatalogSnapshot:
+        """Force a reload regardless of file modification time, off the event loop"""
+        return await asyncio.to_thread(self.load)
+
+    def _reload_in_background(self):
+        if self._reloading is not None and self._reloading.is_alive():
+            return
+        self._reloading = threading.Thread(target=self.load, name="catalog-reload", daemon=True)
+        self._reloading.start()
+
+    def _is_stale(self) -> bool:
+        snapshot = self._snapshot
+        path = resolve_catalog_path()
+        if snapshot is None or path != snapshot.path:
+            return True
+        if path is None:
+            return False
+        try:
+            return os.stat(path).st_mtime != snapshot.mtime
+        except OSError:
+            return False
+
+    def get(self) -> CatalogSnapshot:
+        """
+        Return the current snapshot. If the data file changed, a reload is
+        started in the background and the previous snapshot is returned.
+        """
+        if self._snapshot is None:
+            # Only before startup (e.g. scripts); the app loads it in the lifespan hook
+            return self.load()
+
+        if self.check_interval >= 0:
+            now = time.monotonic()
+            if now - self._last_check >= self.check_interval:
+                self._last_check = now
+                if self._is_stale():
+                    print("🔄 Course data file changed on disk, reloading catalog")
+                    self._reload_in_background()
+
+        return self._snapshot
+
+
+catalog = CourseCatalog()
+
+
+def get_catalog() -> CatalogSnapshot:
+    """Current catalog snapshot for request handlers"""
+    return catalog.get()
+
+
+async def reload_catalog() -> CatalogSnapshot:
+    """Explicitly reload the catalog from disk"""
+    return await catalog.reload()
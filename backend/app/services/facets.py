@@ -0,0 +1,74 @@
+"""Precomputed facet posting lists for course filtering.
+
+Built once per catalog snapshot. Each facet value maps to the set of doc ids
+(positions in the catalog list) that carry it, so filter combinations are set
+unions/intersections over a few dozen values instead of scans over every
+course.
+"""
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional
+
+FACET_FIELDS = ("department", "academic_group", "academic_org", "level")
+
+# The department filter matches any of these fields, as it always has
+DEPARTMENT_FIELDS = ("department", "academic_group", "academic_org")
+
+
+class CourseFacets:
+    """Posting lists and counts for each facet field"""
+
+    def __init__(self, courses: List[Dict]):
+        self._doc_values: Dict[str, List[str]] = {field: [] for field in FACET_FIELDS}
+        postings: Dict[str, Dict[str, set]] = {field: defaultdict(set) for field in FACET_FIELDS}
+
+        for doc_id, course in enumerate(courses):
+            for field in FACET_FIELDS:
+                value = str(course.get(field) or "")
+                self._doc_values[field].append(value)
+                if value:
+                    postings[field][value].add(doc_id)
+
+        self.postings: Dict[str, Dict[str, frozenset]] = {
+            field: {value: frozenset(docs) for value, docs in values.items()}
+            for field, values in postings.items()
+        }
+        self.totals: Dict[str, Dict[str, int]] = {
+            field: self._sorted_counts({value: len(docs) for value, docs in values.items()})
+            for field, values in self.postings.items()
+        }
+
+    @staticmethod
+    def _sorted_counts(counts: Dict[str, int]) -> Dict[str, int]:
+        return dict(sorted(counts.items(), key=lambda item: (-item[1], item[0])))
+
+    def docs_matching(self, fields: Iterable[str], needle: str) -> set:
+        """Docs whose value in any of ``fields`` contains ``needle`` (case-insensitive)"""
+        needle = needle.lower()
+        docs = set()
+        for field in fields:
+            for value, posting in self.postings[field].items():
+                if needle in value.lower():
+                    docs |= posting
+        return docs
+
+    def filter(self, department: Optional[str] = None, level: Optional[str] = None) -> Optional[set]:
+        """Doc ids passing the given filters, or None when no filter is set"""
+        result = None
+        if department:
+            result = self.docs_matching(DEPARTMENT_FIELDS, department)
+        if level:
+            level_docs = self.docs_matching(("level",), level)
+            result = level_docs if result is None else result & level_docs
+        return result
+
+    def counts(self, doc_ids: Optional[List[int]] = None) -> Dict[str, Dict[str, int]]:
+        """Facet value counts over ``doc_ids`` (the whole catalog when None)"""
+        if doc_ids is None:
+            return self.totals
+        counts = {}
+        for field in FACET_FIELDS:
+            values = self._doc_values[field]
+            counter = Counter(values[doc_id] for doc_id in doc_ids)
+            counter.pop("", None)
+            counts[field] = self._sorted_counts(counter)
+        return counts
@@ -0,0 +1,140 @@
+"""In-process background job queue.
+
+Slow work (several upstream calls and an LLM generation) is submitted as a
+job and run by a small pool of asyncio workers, so the HTTP request that
+submitted it returns at once with a job id to poll. Jobs are deduplicated by
+a caller-supplied key: submitting the same work while it is queued, running
+or recently finished returns the existing job. Failed jobs are not reused.
+Finished jobs are kept for ``result_ttl`` seconds.
+"""
+import asyncio
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class QueueFull(RuntimeError):
+    """Raised when ``max_pending`` jobs are already waiting to run"""
+
+
+class Job:
+    def __init__(self, key: Hashable, payload: Any):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.payload = payload
+        self.status = QUEUED
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.done = asyncio.Event()
+
+    def to_dict(self) -> Dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobQueue:
+    def __init__(self, handler: Callable[[Any], Awaitable[Any]], workers: int = 2,
+                 max_pending: int = 100, result_ttl: float = 3600, name: str = "jobs"):
+        self.handler = handler
+        self.workers = workers
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self.name = name
+        self.jobs: Dict[str, Job] = {}
+        self._by_key: Dict[Hashable, Job] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def start(self):
+        """Start the worker pool in the running event loop (no-op if already running there)"""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._tasks:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        # Jobs queued in a previous loop can never run now
+        for job in list(self.jobs.values()):
+            if job.status in (QUEUED, RUNNING):
+                self._finish(job, error="worker pool restarted")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, key: Hashable, payload: Any) -> Job:
+        """Queue work for ``key``, or return the job already covering it"""
+        self.start()
+        self._prune()
+        existing = self._by_key.get(key)
+        if existing is not None and existing.status != FAILED:
+            return existing
+        if self._queue.qsize() >= self.max_pending:
+            raise QueueFull(f"{self.name}: {self._queue.qsize()} jobs already pending")
+
+        job = Job(key, payload)
+        self.jobs[job.id] = job
+        self._by_key[key] = job
+        self._queue.put_nowait(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    async def wait(self, job: Job, timeout: Optional[float] = None) -> Job:
+        """Wait for ``job`` to finish (raises asyncio.TimeoutError; the job keeps running)"""
+        await asyncio.wait_for(job.done.wait(), timeout)
+        return job
+
+    def stats(self) -> Dict:
+        counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+        for job in self.jobs.values():
+            counts[job.status] += 1
+        return {"workers": len(self._tasks), **counts}
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                job.status = RUNNING
+                result = await self.handler(job.payload)
+                self._finish(job, result=result)
+            except asyncio.CancelledError:
+                self._finish(job, error="worker stopped")
+                raise
+            except Exception as e:
+                print(f"❌ {self.name} job {job.id} failed: {e}")
+                self._finish(job, error=str(e))
+            finally:
+                self._queue.task_done()
+
+    def _finish(self, job: Job, result: Any = None, error: Optional[str] = None):
+        job.status = FAILED if error else DONE
+        job.result = result
+        job.error = error
+        job.finished_at = time.time()
+        job.done.set()
+
+    def _prune(self):
+        """Forget finished jobs older than the result TTL"""
+        cutoff = time.time() - self.result_ttl
+        for job in [j for j in self.jobs.values() if j.finished_at and j.finished_at < cutoff]:
+            del self.jobs[job.id]
+            if self._by_key.get(job.key) is job:
+                del self._by_key[job.key]
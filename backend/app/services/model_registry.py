@@ -0,0 +1,116 @@
+"""Gemini model discovery, preference ordering and circuit breaking.
+
+``genai.list_models()`` is a network round trip, so the registry calls it once
+at startup and again only after ``ttl`` seconds. Callers ask for an ordered
+candidate list: the explicitly requested model, then the model that last
+succeeded, then preferred models the API reports as available, then the rest
+of the preferred list. Models that keep failing are skipped for a cooldown
+period so dead models stop adding latency to every request.
+"""
+import asyncio
+import threading
+import time
+from typing import Dict, List, Optional, Set
+
+import google.generativeai as genai
+
+
+def bare_model_name(name: str) -> str:
+    """'models/gemini-2.0-flash' -> 'gemini-2.0-flash'"""
+    return name[len("models/"):] if name.startswith("models/") else name
+
+
+class ModelRegistry:
+    def __init__(self, ttl: float = 3600, failure_threshold: int = 2, cooldown: float = 300):
+        self.ttl = ttl
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.available: Set[str] = set()
+        self.last_success: Optional[str] = None
+        self._discovered_at: Optional[float] = None
+        self._failures: Dict[str, int] = {}
+        self._open_until: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def discover(self) -> Set[str]:
+        """List models that support generateContent (blocking network call)"""
+        try:
+            names = set()
+            for model in genai.list_models():
+                methods = getattr(model, "supported_generation_methods", None) or []
+                name = getattr(model, "name", None) or (model.get("name") if isinstance(model, dict) else None)
+                if name and (not methods or "generateContent" in methods):
+                    names.add(bare_model_name(name))
+            with self._lock:
+                self.available = names
+            print(f"✅ Discovered {len(names)} Gemini models")
+        except Exception as e:
+            # Keep whatever we had; candidates fall back to the preferred list
+            print(f"Warning: failed to list models: {e}")
+        self._discovered_at = time.monotonic()
+        return self.available
+
+    def is_stale(self) -> bool:
+        return self._discovered_at is None or time.monotonic() - self._discovered_at >= self.ttl
+
+    async def refresh_if_stale(self):
+        """Re-run discovery off the event loop once the TTL has passed"""
+        if not self.is_stale():
+            return
+        # Mark as fresh first so concurrent requests don't all rediscover
+        self._discovered_at = time.monotonic()
+        if self.available:
+            # The current list is good enough for this request; refresh in the background
+            asyncio.get_running_loop().run_in_executor(None, self.discover)
+        else:
+            await asyncio.to_thread(self.discover)
+
+    def _is_open(self, model: str) -> bool:
+        return self._open_until.get(model, 0) > time.monotonic()
+
+    def candidates(self, preferred: List[str], requested: Optional[str] = None) -> List[str]:
+        """Ordered, de-duplicated models to try for a request"""
+        preferred_bare = {bare_model_name(p) for p in preferred}
+        ordered = []
+        if requested:
+            ordered.append(requested)
+        if self.last_success and bare_model_name(self.last_success) in preferred_bare:
+            ordered.extend(p for p in preferred if bare_model_name(p) == bare_model_name(self.last_success))
+        ordered.extend(p for p in preferred if bare_model_name(p) in self.available)
+        ordered.extend(preferred)
+
+        seen = set()
+        unique = []
+        for model in ordered:
+            key = bare_model_name(model)
+            if key not in seen:
+                seen.add(key)
+                unique.append(model)
+
+        closed = [m for m in unique if m == requested or not self._is_open(bare_model_name(m))]
+        # If every breaker is open, still try something rather than failing outright
+        return closed or unique
+
+    def record_success(self, model: str):
+        key = bare_model_name(model)
+        with self._lock:
+            self.last_success = key
+            self._failures.pop(key, None)
+            self._open_until.pop(key, None)
+
+    def record_failure(self, model: str):
+        key = bare_model_name(model)
+        with self._lock:
+            failures = self._failures.get(key, 0) + 1
+            self._failures[key] = failures
+            if failures >= self.failure_threshold:
+                self._open_until[key] = time.monotonic() + self.cooldown
+                if self.last_success == key:
+                    self.last_success = None
+
+    def status(self) -> Dict:
+        return {
+            "available": sorted(self.available),
+            "last_success": self.last_success,
+            "open_circuits": sorted(m for m in self._open_until if self._is_open(m)),
+        }
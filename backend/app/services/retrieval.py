@@ -0,0 +1,208 @@
+"""BM25 course retrieval for building LLM prompts.
+
+The processed catalog only carries codes, subjects and departments (titles
+are just the code), so each course is also described by the plain-English
+subject area below. Queries and course text go through the same normaliser
+(``terms``): common abbreviations and compounds are expanded and suffixes are
+stripped until none applies, so 'engineering', 'engineers' and 'engineer'
+become one term. The index is a term-by-course matrix stored column-wise
+as flat NumPy arrays (CSC layout) with BM25 weights precomputed, so scoring a
+query is a few vectorized adds over the posting lists of its terms.
+"""
+from functools import lru_cache
+from typing import Dict, List
+
+import numpy as np
+
+from app.utils.text import tokenize
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Stripped repeatedly, longest first, so 'scientist', 'scientific' and 'science' all become 'sci'
+_SUFFIXES = (
+    "ation", "ment", "ical", "ific", "ence", "ance", "ity", "ing", "ist", "ism", "ics", "ian",
+    "ent", "ers", "ive", "er", "or", "al", "ic", "ed", "es", "e", "s", "y",
+)
+MIN_STEM = 3
+_VOWELS = set("aeiouy")
+
+# Abbreviations and compounds career goals use but course text spells out
+EXPANSIONS: Dict[str, str] = {
+    "ai": "artificial intelligence",
+    "ml": "machine learning",
+    "nlp": "natural language processing",
+    "cv": "computer vision",
+    "cs": "computer science",
+    "swe": "software engineering",
+    "cybersecurity": "cyber security",
+    "infosec": "information security",
+    "fullstack": "full stack web",
+    "frontend": "front end web",
+    "backend": "back end web",
+    "devops": "software operations",
+    "ux": "user experience design",
+    "ui": "user interface design",
+    "gamedev": "game development",
+}
+
+# Plain-English keywords for common BU subject codes (school prefix + discipline)
+SUBJECT_AREAS: Dict[str, str] = {
+    "CASCS": "computer science programming software algorithms data structures systems machine learning artificial intelligence graphics games web development",
+    "GRSCS": "computer science programming software algorithms systems machine learning artificial intelligence research",
+    "METCS": "computer science programming software development web full stack information technology cyber security databases networks",
+    "CDSDS": "computing data science statistics machine learning artificial intelligence analytics programming",
+    "ENGEC": "electrical computer engineering hardware software embedded systems networks security",
+    "ENGME": "mechanical engineering robotics manufacturing design",
+    "ENGBE": "biomedical engineering biology medicine devices",
+    "ENGEK": "engineering fundamentals",
+    "CASMA": "mathematics statistics probability calculus linear algebra",
+    "CASEC": "economics finance markets policy",
+    "CASPY": "physics",
+    "CASCH": "chemistry",
+    "CASBI": "biology life sciences",
+    "CASNE": "neuroscience brain biology",
+    "CASPS": "psychology behavior cognition",
+    "CASPO": "political science government policy",
+    "CASIR": "international relations global affairs policy",
+    "CASHI": "history",
+    "CASEN": "english literature writing",
+    "CASPH": "philosophy ethics logic",
+    "CASSO": "sociology society",
+    "CASAN": "anthropology culture",
+    "CASAH": "art history",
+    "CASEE": "earth environment climate sustainability",
+    "CASLX": "linguistics language",
+    "QSTFE": "finance business investment",
+    "QSTMK": "marketing business",
+    "QSTIS": "information systems business technology analytics",
+    "QSTBA": "business analytics data statistics",
+    "QSTAC": "accounting business finance",
+    "QSTSI": "strategy innovation entrepreneurship business management",
+    "METAD": "administrative sciences management business project",
+    "METCJ": "criminal justice law",
+    "METUA": "urban affairs cities policy",
+    "COMJO": "journalism media writing",
+    "COMFT": "film television media production",
+    "COMCM": "communication media advertising public relations",
+    "SPHPH": "public health",
+    "SPHBS": "biostatistics statistics public health data",
+    "SPHEP": "epidemiology public health",
+    "SPHGH": "global health public health",
+    "LAWJD": "law legal",
+    "MEDMS": "medicine medical health",
+    "SARHS": "health sciences",
+    "SONNU": "nursing nurse patient care health",
+    "CFATH": "theatre performance arts",
+    "CFAAR": "art visual arts design",
+    "WEDED": "education teaching",
+    "WEDSE": "special education teaching",
+}
+
+
+@lru_cache(maxsize=65536)
+def stem(token: str) -> str:
+    """Strip suffixes until none applies: 'engineering' -> 'engineer' -> 'engine' -> 'engin'"""
+    stripped = False
+    while True:
+        for suffix in _SUFFIXES:
+            if token.endswith(suffix) and len(token) - len(suffix) >= MIN_STEM:
+                token = token[:-len(suffix)]
+                stripped = True
+                break
+        else:
+            break
+    # 'programming' -> 'programm' -> 'program'
+    if stripped and len(token) > MIN_STEM and token[-1] == token[-2] and token[-1] not in _VOWELS:
+        token = token[:-1]
+    return token
+
+
+def terms(text: str) -> List[str]:
+    """Normalised terms of ``text`` (used for both queries and course text)"""
+    words = []
+    for token in tokenize(text):
+        expansion = EXPANSIONS.get(token)
+        words.extend(tokenize(expansion) if expansion else (token,))
+    return [stem(word) for word in words]
+
+
+def course_terms(course: Dict) -> List[str]:
+    """Tokens describing a course for retrieval"""
+    subject = str(course.get("subject") or "")
+    parts = [
+        course.get("code"),
+        course.get("title"),
+        subject,
+        course.get("department"),
+        SUBJECT_AREAS.get(subject.upper(), ""),
+    ]
+    words = []
+    for part in parts:
+        words.extend(terms(part or ""))
+    return words
+
+
+class CourseRetriever:
+    """BM25 index over a list of course dicts"""
+
+    def __init__(self, courses: List[Dict]):
+        self.courses = courses
+        n_docs = len(courses)
+
+        # term -> {doc: term frequency}
+        postings: Dict[str, Dict[int, int]] = {}
+        lengths = np.zeros(n_docs, dtype=np.float32)
+        for doc_id, course in enumerate(courses):
+            words = course_terms(course)
+            lengths[doc_id] = len(words)
+            for term in words:
+                doc_tf = postings.setdefault(term, {})
+                doc_tf[doc_id] = doc_tf.get(doc_id, 0) + 1
+
+        self.vocabulary = {term: i for i, term in enumerate(postings)}
+        indptr = np.zeros(len(postings) + 1, dtype=np.int64)
+        doc_ids = []
+        tfs = []
+        for i, doc_tf in enumerate(postings.values()):
+            indptr[i + 1] = indptr[i] + len(doc_tf)
+            doc_ids.extend(doc_tf.keys())
+            tfs.extend(doc_tf.values())
+        self.indptr = indptr
+        self.doc_ids = np.asarray(doc_ids, dtype=np.int64)
+        tf = np.asarray(tfs, dtype=np.float32)
+
+        # Precompute per-posting BM25 weight = idf * saturated, length-normalized tf
+        avg_length = float(lengths.mean()) if n_docs else 0.0
+        df = np.diff(indptr).astype(np.float32)
+        idf = np.log1p((n_docs - df + 0.5) / (df + 0.5))
+        term_of_posting = np.repeat(np.arange(len(postings)), np.diff(indptr))
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[self.doc_ids] / max(avg_length, 1e-9))
+        self.weights = idf[term_of_posting] * tf * (BM25_K1 + 1) / (tf + norm)
+
+    def scores(self, query: str, weight: float = 1.0, into: np.ndarray = None) -> np.ndarray:
+        """BM25 score of every course for ``query``"""
+        scores = into if into is not None else np.zeros(len(self.courses), dtype=np.float32)
+        for term in set(terms(query)):
+            term_id = self.vocabulary.get(term)
+            if term_id is None:
+                continue
+            start, end = self.indptr[term_id], self.indptr[term_id + 1]
+            # A term appears at most once per course in its posting list, so plain fancy-index add is safe
+            scores[self.doc_ids[start:end]] += weight * self.weights[start:end]
+        return scores
+
+    def top_k(self, query: str, k: int, context: str = "", context_weight: float = 0.5) -> List[Dict]:
+        """The ``k`` best-matching courses for ``query``; ``context`` (e.g. the major) counts less"""
+        scores = self.scores(query)
+        if context:
+            self.scores(context, weight=context_weight, into=scores)
+
+        matched = np.flatnonzero(scores > 0)
+        if len(matched) == 0:
+            return []
+        if len(matched) > k:
+            matched = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+        # Best score first, catalog order among ties
+        order = np.lexsort((matched, -scores[matched]))
+        return [self.courses[i] for i in matched[order]]
@@ -0,0 +1,164 @@
+"""Inverted-index course search.
+
+Built once per catalog snapshot. Every searchable field is broken into
+character n-grams (1 to 3 characters) and word tokens; a query is answered by
+intersecting the posting lists of its trigrams to get a small candidate set,
+which is then verified and ranked. Query cost depends on the number of
+matching courses, not on the size of the catalog.
+"""
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.utils.text import normalize_code, tokenize
+
+SEARCH_FIELDS = ("code", "title", "subject", "catalog_number", "department")
+MAX_GRAM = 3
+
+# Rank tiers, best first
+EXACT_CODE = 0
+CODE_PREFIX = 1
+EXACT_TOKEN = 2
+TOKEN_PREFIX = 3
+SUBSTRING = 4
+ALL_TOKENS = 5
+
+
+def _grams(text: str) -> Iterable[str]:
+    """All substrings of length 1..MAX_GRAM"""
+    for size in range(1, MAX_GRAM + 1):
+        for i in range(len(text) - size + 1):
+            yield text[i:i + size]
+
+
+def _query_grams(text: str) -> List[str]:
+    """Grams a matching field must contain; short queries are a gram themselves"""
+    if len(text) <= MAX_GRAM:
+        return [text]
+    return list({text[i:i + MAX_GRAM] for i in range(len(text) - MAX_GRAM + 1)})
+
+
+class CourseSearchIndex:
+    """Token + n-gram inverted index over a list of course dicts"""
+
+    def __init__(self, courses: List[Dict]):
+        self.courses = courses
+        self._values: List[Tuple[str, ...]] = []
+        self._code_keys: List[str] = []
+        self._doc_tokens: List[Tuple[str, ...]] = []
+        self._grams: Dict[str, List[int]] = defaultdict(list)
+        self._tokens: Dict[str, List[int]] = defaultdict(list)
+
+        for doc_id, course in enumerate(courses):
+            values = tuple(str(course.get(field) or "").lower() for field in SEARCH_FIELDS)
+            code_key = normalize_code(course.get("code") or "").lower()
+
+            grams = set()
+            tokens = set()
+            for value in values + (code_key,):
+                grams.update(_grams(value))
+                tokens.update(tokenize(value))
+
+            # doc ids are visited in increasing order, so posting lists stay sorted
+            for gram in grams:
+                self._grams[gram].append(doc_id)
+            for token in tokens:
+                self._tokens[token].append(doc_id)
+
+            self._values.append(values)
+            self._code_keys.append(code_key)
+            self._doc_tokens.append(tuple(tokens))
+
+        self._grams = dict(self._grams)
+        self._tokens = dict(self._tokens)
+
+        # Tie-break equally ranked hits by course code
+        order = sorted(range(len(courses)), key=lambda i: (self._values[i][0], i))
+        self._code_rank = [0] * len(courses)
+        for position, doc_id in enumerate(order):
+            self._code_rank[doc_id] = position
+
+    def __len__(self) -> int:
+        return len(self.courses)
+
+    def _candidates(self, text: str) -> set:
+        """Docs whose grams cover ``text`` (a superset of the true matches)"""
+        postings = []
+        for gram in _query_grams(text):
+            posting = self._grams.get(gram)
+            if not posting:
+                return set()
+            postings.append(posting)
+        postings.sort(key=len)
+        result = set(postings[0])
+        for posting in postings[1:]:
+            result.intersection_update(posting)
+            if not result:
+                break
+        return result
+
+    def _contains(self, doc_id: int, text: str, code_text: str) -> bool:
+        if code_text and code_text in self._code_keys[doc_id]:
+            return True
+        return any(text in value for value in self._values[doc_id])
+
+    def _tier(self, doc_id: int, query: str, query_code: str, exact_token_docs: set) -> int:
+        code_key = self._code_keys[doc_id]
+        if query_code and code_key == query_code:
+            return EXACT_CODE
+        if query_code and code_key.startswith(query_code):
+            return CODE_PREFIX
+        if doc_id in exact_token_docs:
+            return EXACT_TOKEN
+        if any(token.startswith(query) for token in self._doc_tokens[doc_id]):
+            return TOKEN_PREFIX
+        if self._contains(doc_id, query, query_code):
+            return SUBSTRING
+        return ALL_TOKENS
+
+    def match(self, query: str, within: Optional[set] = None) -> List[int]:
+        """Ranked doc ids matching ``query``, optionally restricted to ``within``.
+
+        A course matches when the whole query is a substring of a searchable
+        field (or of its normalized code), or when every query word is.
+        """
+        query = " ".join(str(query or "").lower().split())
+        if not query:
+            if within is None:
+                return list(range(len(self.courses)))
+            return sorted(within)
+
+        query_code = normalize_code(query).lower()
+
+        # Whole-query substring matches
+        candidates = self._candidates(query)
+        if query_code != query:
+            candidates |= self._candidates(query_code)
+        if within is not None:
+            candidates &= within
+        hits = {doc_id for doc_id in candidates if self._contains(doc_id, query, query_code)}
+
+        # Multi-word queries also match when every word appears somewhere
+        words = tokenize(query)
+        if len(words) > 1:
+            word_docs = None
+            for word in sorted(words, key=len, reverse=True):
+                docs = self._candidates(word)
+                word_docs = docs if word_docs is None else word_docs & docs
+                if not word_docs:
+                    break
+            if word_docs:
+                if within is not None:
+                    word_docs &= within
+                hits.update(
+                    doc_id for doc_id in word_docs
+                    if all(self._contains(doc_id, word, "") for word in words)
+                )
+
+        exact_token_docs = set(self._tokens.get(query, ()))
+        return sorted(
+            hits,
+            key=lambda doc_id: (
+                self._tier(doc_id, query, query_code, exact_token_docs),
+                self._code_rank[doc_id],
+            ),
+        )
@@ -0,0 +1,63 @@
+"""Request coalescing for identical concurrent upstream calls.
+
+When many requests need the same OpenAlex record or the same LLM answer at
+the same moment, only the first one calls upstream; the rest await that call
+and share its result (or its exception). Each key accepts a bounded number
+of waiters, and timeouts propagate: the first caller's timeout bounds the
+shared call for everyone, and every caller also stops waiting after its own
+timeout without cancelling the call for the others.
+"""
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class TooManyWaiters(RuntimeError):
+    """Raised when a key already has ``max_waiters`` callers queued on it"""
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self, max_waiters: int = 100):
+        self.max_waiters = max_waiters
+        self._flights: Dict[Hashable, _Flight] = {}
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]], timeout: Optional[float] = None) -> T:
+        """Run ``fn()`` unless a call for ``key`` is already in flight, then share its result"""
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(self._run(key, fn, timeout)))
+            # Nobody may be left to await a failed call; retrieve the exception so asyncio doesn't warn
+            flight.task.add_done_callback(lambda task: task.cancelled() or task.exception())
+            self._flights[key] = flight
+        elif flight.waiters >= self.max_waiters:
+            raise TooManyWaiters(f"{flight.waiters} callers already waiting on {key!r}")
+
+        flight.waiters += 1
+        try:
+            # Shielded so a caller timing out or disconnecting doesn't cancel the shared call
+            if timeout is None:
+                return await asyncio.shield(flight.task)
+            return await asyncio.wait_for(asyncio.shield(flight.task), timeout)
+        finally:
+            flight.waiters -= 1
+
+    async def _run(self, key: Hashable, fn: Callable[[], Awaitable[T]], timeout: Optional[float]) -> T:
+        try:
+            if timeout is None:
+                return await fn()
+            return await asyncio.wait_for(fn(), timeout)
+        finally:
+            # Later callers start a fresh call (and see a fresh cache entry)
+            self._flights.pop(key, None)
@@ -0,0 +1,15 @@
+"""Small text helpers shared by the catalog lookup and search indexes."""
+import re
+from typing import List
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize_code(code: str) -> str:
+    """Fold case, whitespace and dashes so 'cs-111', 'CS 111' and 'CS111' match"""
+    return re.sub(r"[\s\-]+", "", str(code)).upper()
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase alphanumeric tokens"""
+    return _TOKEN_RE.findall(str(text).lower())
@@ -0,0 +1,107 @@
+# backend/processing_csv/benchmark_process.py
+"""Benchmark the vectorized processing stages against the old row-by-row code.
+
+Builds a registrar-style DataFrame from processed_courses_2022_onwards.csv
+(repeated to the requested size), runs the old and new implementations on
+it, checks that they produce identical output and prints the timings:
+
+    python benchmark_process.py [rows]
+"""
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import pandas as pd
+
+from process_courses import CourseDataProcessor, effective_years
+
+PROCESSED_CSV = Path(__file__).parent / 'processed_courses_2022_onwards.csv'
+
+def make_raw_frame(rows: int) -> pd.DataFrame:
+    """Registrar-style columns rebuilt from the processed CSV, repeated to ``rows`` rows"""
+    processed = pd.read_csv(PROCESSED_CSV, dtype=str, keep_default_na=False)
+    raw = pd.DataFrame({
+        'crse_id': processed['id'].astype(int),
+        'subject': processed['subject'],
+        'catalog_nbr': processed['catalog_number'],
+        'acad_group': processed['academic_group'],
+        'acad_org': processed['academic_org'],
+        'acad_career': processed['career_level'],
+        'effdt_year': pd.to_numeric(processed['effective_year'], errors='coerce'),
+    })
+    raw['effdt'] = processed['effective_year'] + '-07-01 00:00:00.000'
+    # A few blank catalog numbers and years so the missing-value paths are exercised
+    raw.loc[raw.index[::97], 'catalog_nbr'] = None
+    raw.loc[raw.index[::89], 'effdt_year'] = None
+    # Sentinel, blank and irregular effective dates
+    odd_dates = ['1901-01-01 00:00:00.000', None, '', '2023/05/01', 'x 2021-02-03', '9999-12-31 00:00:00.000', 'n/a']
+    for offset, value in enumerate(odd_dates):
+        raw.loc[raw.index[offset::101], 'effdt'] = value
+    repeats = -(-rows // len(raw))
+    return pd.concat([raw] * repeats, ignore_index=True).head(rows)
+
+def legacy_extract_year(date_str):
+    """The previous per-row effdt year parser used by filter_recent_courses"""
+    if pd.isna(date_str) or date_str in ['', 'nan', 'None', '1901-01-01 00:00:00.000']:
+        return None
+    for pattern in (r'^(\d{4})', r'(\d{4})-\d{2}-\d{2}'):
+        match = re.search(pattern, str(date_str))
+        if match:
+            return int(match.group(1))
+    return None
+
+def legacy_process_for_api(processor: CourseDataProcessor) -> List[Dict]:
+    """The previous iterrows implementation of process_for_api"""
+    processed_courses = []
+    for index, row in processor.df.iterrows():
+        processed_courses.append({
+            'id': str(row.get('crse_id', f'course_{index}')),
+            'subject': str(row.get('subject', '')),
+            'catalog_number': str(row.get('catalog_nbr', '')),
+            'code': f"{row.get('subject', '')} {row.get('catalog_nbr', '')}".strip(),
+            'academic_group': str(row.get('acad_group', '')),
+            'academic_org': str(row.get('acad_org', '')),
+            'career_level': str(row.get('acad_career', '')),
+            'effective_year': int(row.get('effdt_year', 0)) if pd.notna(row.get('effdt_year')) else None,
+            'level': processor.extract_course_level(row.get('catalog_nbr')),
+            'department': str(row.get('acad_org', row.get('acad_group', ''))),
+            'title': f"{row.get('subject', '')} {row.get('catalog_nbr', '')}"
+        })
+    return processed_courses
+
+def time_call(fn: Callable):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+def benchmark_effective_years(df: pd.DataFrame):
+    legacy, legacy_seconds = time_call(lambda: df['effdt'].astype(str).apply(legacy_extract_year))
+    vectorized, vectorized_seconds = time_call(lambda: effective_years(df['effdt']))
+
+    pd.testing.assert_series_equal(vectorized, legacy.astype(float), check_names=False)
+    print(f"\n⏱️  effdt year extraction on {len(df):,} rows:")
+    print(f"   apply + regex: {legacy_seconds:8.3f}s")
+    print(f"   vectorized:    {vectorized_seconds:8.3f}s ({legacy_seconds / vectorized_seconds:.1f}x faster)")
+
+def benchmark_process_for_api(df: pd.DataFrame):
+    processor = CourseDataProcessor('')
+    processor.df = df
+
+    legacy, legacy_seconds = time_call(lambda: legacy_process_for_api(processor))
+    vectorized, vectorized_seconds = time_call(processor.process_for_api)
+
+    assert vectorized == legacy, "vectorized process_for_api output differs from the row-by-row version"
+    print(f"\n⏱️  process_for_api on {len(df):,} rows:")
+    print(f"   iterrows:   {legacy_seconds:8.3f}s")
+    print(f"   vectorized: {vectorized_seconds:8.3f}s ({legacy_seconds / vectorized_seconds:.1f}x faster)")
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    df = make_raw_frame(rows)
+    benchmark_effective_years(df)
+    benchmark_process_for_api(df)
+
+if __name__ == "__main__":
+    main()
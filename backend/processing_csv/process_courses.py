@@ -2,15 +2,81 @@
 import pandas as pd
 import numpy as np
 from typing import List, Dict, Any
+import argparse
 import json
 import re
 import os
 from pathlib import Path
 from datetime import datetime
 
+# Upper bounds (exclusive) of the catalog-number level bands; anything higher is Graduate
+LEVEL_BANDS = [
+    (100, "Introductory"),
+    (200, "Undergraduate Lower"),
+    (300, "Undergraduate Upper"),
+    (500, "Advanced Undergraduate"),
+]
+
+# Earliest effective year kept by filter_recent_courses unless overridden
+DEFAULT_CUTOFF_YEAR = 2022
+
+# Placeholder effdt PeopleSoft uses for rows without a real effective date
+EFFDT_SENTINEL_DATE = '1901-01-01'
+
+# Columns the pipeline reads, with explicit types so chunks parse consistently
+RAW_COLUMN_DTYPES = {
+    'crse_id': str,
+    'effdt': str,
+    'subject': str,
+    'catalog_nbr': str,
+    'acad_group': str,
+    'acad_org': str,
+    'acad_career': str,
+    'course_approved': str,
+}
+
+DEFAULT_CHUNKSIZE = 100_000
+
+def _parse_years(effdt: pd.Series) -> pd.Series:
+    """Year of each distinct effdt value (NaN for blanks and the sentinel)"""
+    if pd.api.types.is_datetime64_any_dtype(effdt):
+        return effdt.dt.year.astype(float).mask(effdt.dt.normalize() == pd.Timestamp(EFFDT_SENTINEL_DATE))
+    
+    text = effdt.astype(str)
+    missing = text.isin(['', 'nan', 'None', 'NaT']) | text.str.startswith(EFFDT_SENTINEL_DATE)
+    years = pd.to_datetime(text, errors='coerce', format='ISO8601').dt.year.astype(float)
+    # Unparseable or out-of-range dates: leading four digits, then a YYYY-MM-DD anywhere
+    leading = text.str.slice(0, 4)
+    years = years.fillna(pd.to_numeric(leading.where(leading.str.isdigit()), errors='coerce'))
+    embedded = text.str.extract(r'(\d{4})-\d{2}-\d{2}', expand=False)
+    years = years.fillna(pd.to_numeric(embedded, errors='coerce'))
+    return years.mask(missing)
+
+def effective_years(effdt: pd.Series) -> pd.Series:
+    """Vectorized year of each effdt value (NaN for blanks and the 1901-01-01 sentinel).
+    
+    Exports repeat a small set of dates, so each distinct value is parsed once
+    and the years are mapped back by factorized code.
+    """
+    codes, uniques = pd.factorize(effdt)
+    unique_years = _parse_years(pd.Series(uniques)).to_numpy(dtype=float)
+    # Code -1 (missing value) picks the trailing NaN
+    years = np.append(unique_years, np.nan)[codes]
+    return pd.Series(years, index=effdt.index)
+
+def course_levels(catalog_numbers: pd.Series) -> pd.Series:
+    """Vectorized extract_course_level for a whole catalog_nbr column"""
+    numbers = pd.to_numeric(
+        catalog_numbers.astype(str).str.extract(r'(\d+)', expand=False), errors='coerce'
+    )
+    conditions = [numbers < upper for upper, _ in LEVEL_BANDS] + [numbers.notna()]
+    choices = [name for _, name in LEVEL_BANDS] + ["Graduate"]
+    return pd.Series(np.select(conditions, choices, default="Unknown"), index=catalog_numbers.index)
+
 class CourseDataProcessor:
-    def __init__(self, csv_file_path: str):
+    def __init__(self, csv_file_path: str, cutoff_year: int = DEFAULT_CUTOFF_YEAR):
         self.csv_file_path = csv_file_path
+        self.cutoff_year = cutoff_year
         self.df = None
         self.processed_courses = []
         
@@ -41,6 +107,69 @@ class CourseDataProcessor:
             print(f"❌ Error loading CSV file: {e}")
             return False
     
+    def load_streaming(self, chunksize: int = DEFAULT_CHUNKSIZE) -> bool:
+        """Read, filter, clean and deduplicate the CSV chunk by chunk.
+        
+        Only the pipeline's columns are read, and each chunk is reduced to
+        approved, cutoff-year-onwards rows before being merged into one row per
+        crse_id (the one with the latest effdt), so memory is bounded by the
+        output rather than the export. Leaves self.df ready for process_for_api.
+        """
+        try:
+            print(f"📁 Streaming data from {self.csv_file_path} in chunks of {chunksize:,} rows...")
+            
+            header = pd.read_csv(self.csv_file_path, skiprows=1, nrows=0).columns
+            missing = [col for col in ('crse_id', 'effdt', 'catalog_nbr') if col not in header]
+            if missing:
+                print(f"❌ Required columns not found: {missing}")
+                return False
+            usecols = [col for col in RAW_COLUMN_DTYPES if col in header]
+            
+            reader = pd.read_csv(self.csv_file_path,
+                                 skiprows=1,  # Skip the first row (mv_ps_crse_offer_202510251534)
+                                 usecols=usecols,
+                                 dtype={col: RAW_COLUMN_DTYPES[col] for col in usecols},
+                                 chunksize=chunksize)
+            
+            kept = None
+            total_rows = 0
+            for chunk in reader:
+                total_rows += len(chunk)
+                chunk = self._reduce_chunk(chunk)
+                kept = chunk if kept is None else pd.concat([kept, chunk])
+                # A course keeps the file position where it first appeared
+                kept['first_row'] = kept.groupby('crse_id')['first_row'].transform('min')
+                # Latest effdt wins; on ties the row later in the file (stable sort)
+                kept = (kept.sort_values('effdt_sort', kind='stable', na_position='first')
+                            .drop_duplicates(subset=['crse_id'], keep='last'))
+                print(f"   {total_rows:>10,} rows read, {len(kept):,} courses kept")
+        except Exception as e:
+            print(f"❌ Error streaming CSV file: {e}")
+            return False
+        
+        if kept is None:
+            print("❌ No rows found.")
+            return False
+        
+        # Back to first-appearance order, like the in-memory pipeline
+        self.df = kept.sort_values('first_row').drop(columns=['effdt_sort', 'first_row'])
+        print(f"✅ Streamed {total_rows:,} rows into {len(self.df):,} courses from {self.cutoff_year} onwards")
+        return True
+    
+    def _reduce_chunk(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """Apply the year filter and cleaning steps to one chunk"""
+        chunk['effdt_year'] = effective_years(chunk['effdt'])
+        keep = chunk['effdt_year'] >= self.cutoff_year
+        if 'course_approved' in chunk.columns:
+            keep &= chunk['course_approved'] == 'A'
+        keep &= chunk['catalog_nbr'].notna() & (chunk['catalog_nbr'] != '')
+        # Rows without a course ID can't be deduplicated
+        keep &= chunk['crse_id'].notna()
+        chunk = chunk[keep].copy()
+        chunk['effdt_sort'] = pd.to_datetime(chunk['effdt'], errors='coerce', format='ISO8601')
+        chunk['first_row'] = chunk.index
+        return chunk
+    
     def explore_data(self):
         """Explore the dataset structure"""
         print("\n" + "="*60)
@@ -68,53 +197,30 @@ class CourseDataProcessor:
                 print(f"   {col:.<20} {non_null:>6,} non-null, sample: {sample}")
     
     def filter_recent_courses(self):
-        """Filter courses from 2022 onwards based on effdt column"""
+        """Filter courses from the cutoff year onwards based on effdt column"""
         print("\n" + "="*60)
-        print("📅 FILTERING COURSES FROM 2022 ONWARDS")
+        print(f"📅 FILTERING COURSES FROM {self.cutoff_year} ONWARDS")
         print("="*60)
         
         if 'effdt' not in self.df.columns:
             print("❌ 'effdt' column not found")
             return
         
-        original_count = len(self.df)
-        
-        # Convert effdt to string and extract year
-        self.df['effdt_str'] = self.df['effdt'].astype(str)
-        
-        # Extract year from effdt
-        def extract_year(date_str):
-            if pd.isna(date_str) or date_str in ['', 'nan', 'None', '1901-01-01 00:00:00.000']:
-                return None
-            
-            # Try to extract year from various date formats
-            year_patterns = [
-                r'^(\d{4})',  # YYYY at start
-                r'(\d{4})-\d{2}-\d{2}',  # YYYY-MM-DD
-            ]
-            
-            for pattern in year_patterns:
-                match = re.search(pattern, str(date_str))
-                if match:
-                    year = int(match.group(1))
-                    return year
-            
-            return None
-        
-        self.df['effdt_year'] = self.df['effdt_str'].apply(extract_year)
+        # Extract year from effdt (column-wise; no per-row Python)
+        self.df['effdt_year'] = effective_years(self.df['effdt'])
         
         # Show year distribution before filtering
         year_counts = self.df['effdt_year'].value_counts().sort_index()
         print("\n📊 Year distribution in dataset:")
         for year, count in year_counts.head(20).items():
             if pd.notna(year):
-                print(f"   {year}: {count:>6,} courses")
+                print(f"   {int(year)}: {count:>6,} courses")
         
-        # Filter for 2022 onwards
-        recent_courses = self.df[self.df['effdt_year'] >= 2022]
+        # Filter for the cutoff year onwards
+        recent_courses = self.df[self.df['effdt_year'] >= self.cutoff_year]
         removed_count = len(self.df) - len(recent_courses)
         
-        print(f"\n✅ Filtered to courses from 2022 onwards:")
+        print(f"\n✅ Filtered to courses from {self.cutoff_year} onwards:")
         print(f"   Before filtering: {len(self.df):,} courses")
         print(f"   After filtering:  {len(recent_courses):,} courses")
         print(f"   Removed:          {removed_count:,} courses")
@@ -125,7 +231,7 @@ class CourseDataProcessor:
             print(f"\n📈 Recent courses by year:")
             for year, count in recent_year_counts.items():
                 if pd.notna(year):
-                    print(f"   {year}: {count:>6,} courses")
+                    print(f"   {int(year)}: {count:>6,} courses")
         
         self.df = recent_courses
     
@@ -174,16 +280,10 @@ class CourseDataProcessor:
         numbers = re.findall(r'\d+', catalog_str)
         if numbers:
             course_num = int(numbers[0])
-            if course_num < 100:
-                return "Introductory"
-            elif course_num < 200:
-                return "Undergraduate Lower"
-            elif course_num < 300:
-                return "Undergraduate Upper"
-            elif course_num < 500:
-                return "Advanced Undergraduate"
-            else:
-                return "Graduate"
+            for upper, level in LEVEL_BANDS:
+                if course_num < upper:
+                    return level
+            return "Graduate"
         
         return "Unknown"
     
@@ -197,34 +297,58 @@ class CourseDataProcessor:
             print("❌ No data to process.")
             return []
         
-        processed_courses = []
-        
-        for index, row in self.df.iterrows():
-            # Create simplified course object (omitting campus, institution, description, credits, approved)
-            course = {
-                # Core identifiers
-                'id': str(row.get('crse_id', f'course_{index}')),
-                'subject': str(row.get('subject', '')),
-                'catalog_number': str(row.get('catalog_nbr', '')),
-                'code': f"{row.get('subject', '')} {row.get('catalog_nbr', '')}".strip(),
-                
-                # Academic info
-                'academic_group': str(row.get('acad_group', '')),
-                'academic_org': str(row.get('acad_org', '')),
-                'career_level': str(row.get('acad_career', '')),
-                
-                # Date information
-                'effective_year': int(row.get('effdt_year', 0)) if pd.notna(row.get('effdt_year')) else None,
-                
-                # Derived fields
-                'level': self.extract_course_level(row.get('catalog_nbr')),
-                'department': str(row.get('acad_org', row.get('acad_group', ''))),
-                
-                # Title only (description omitted)
-                'title': f"{row.get('subject', '')} {row.get('catalog_nbr', '')}"
-            }
+        df = self.df
+        
+        def text_column(name: str) -> pd.Series:
+            """Column as strings (str() of each value, 'nan' for blanks), or '' if missing"""
+            if name in df.columns:
+                return df[name].astype(str)
+            return pd.Series('', index=df.index)
+        
+        subject = text_column('subject')
+        catalog_number = text_column('catalog_nbr')
+        title = subject + ' ' + catalog_number
+        
+        if 'crse_id' in df.columns:
+            course_ids = df['crse_id'].astype(str)
+        else:
+            course_ids = 'course_' + df.index.astype(str).to_series(index=df.index)
+        
+        if 'effdt_year' in df.columns:
+            years = df['effdt_year']
+            effective_year = years.astype('Int64').astype(object).where(years.notna(), None)
+        else:
+            effective_year = pd.Series([None] * len(df), index=df.index, dtype=object)
+        
+        if 'catalog_nbr' in df.columns:
+            level = course_levels(df['catalog_nbr'])
+        else:
+            level = pd.Series("Unknown", index=df.index)
+        
+        # Simplified course objects (omitting campus, institution, description, credits, approved)
+        processed = pd.DataFrame({
+            # Core identifiers
+            'id': course_ids,
+            'subject': subject,
+            'catalog_number': catalog_number,
+            'code': title.str.strip(),
+            
+            # Academic info
+            'academic_group': text_column('acad_group'),
+            'academic_org': text_column('acad_org'),
+            'career_level': text_column('acad_career'),
+            
+            # Date information
+            'effective_year': effective_year,
             
-            processed_courses.append(course)
+            # Derived fields
+            'level': level,
+            'department': text_column('acad_org' if 'acad_org' in df.columns else 'acad_group'),
+            
+            # Title only (description omitted)
+            'title': title,
+        })
+        processed_courses = processed.to_dict('records')
         
         self.processed_courses = processed_courses
         print(f"✅ Processed {len(processed_courses):,} courses for API")
@@ -296,35 +420,49 @@ class CourseDataProcessor:
         for level, count in level_counts.items():
             print(f"   {level:.<25} {count:>5} courses")
         
-        print(f"\n📈 Total unique courses (2022+): {len(analysis_df):,}")
+        print(f"\n📈 Total unique courses ({self.cutoff_year}+): {len(analysis_df):,}")
         print(f"🏢 Total departments: {analysis_df['department'].nunique()}")
         print(f"📖 Total subjects: {analysis_df['subject'].nunique()}")
 
 def main():
+    parser = argparse.ArgumentParser(description="Process the registrar course export for the API")
+    parser.add_argument('--since', type=int, default=DEFAULT_CUTOFF_YEAR,
+                        help="Earliest effective year to keep (default: %(default)s)")
+    parser.add_argument('--stream', action='store_true',
+                        help="Read the CSV in chunks, keeping memory bounded by the output")
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE,
+                        help="Rows per chunk with --stream (default: %(default)s)")
+    args = parser.parse_args()
+    
     # Path to your CSV file
     csv_file_path = os.path.join(os.path.dirname(__file__), 'raw_data.csv')
     
-    print("🎯 UNIVERSITY COURSE DATA PROCESSOR (2022+ ONLY)")
+    print(f"🎯 UNIVERSITY COURSE DATA PROCESSOR ({args.since}+ ONLY)")
     print("=" * 60)
     
     if not os.path.exists(csv_file_path):
         print(f"❌ CSV file not found: {csv_file_path}")
         return
     
-    processor = CourseDataProcessor(csv_file_path)
-    
-    # Step 1: Load and parse CSV
-    if not processor.load_and_parse_csv():
-        return
-    
-    # Step 2: Explore data
-    processor.explore_data()
-    
-    # Step 3: Filter for 2022+ courses
-    processor.filter_recent_courses()
+    processor = CourseDataProcessor(csv_file_path, cutoff_year=args.since)
     
-    # Step 4: Clean data
-    processor.clean_data()
+    if args.stream:
+        # Steps 1-4 in one pass over the file
+        if not processor.load_streaming(args.chunksize):
+            return
+    else:
+        # Step 1: Load and parse CSV
+        if not processor.load_and_parse_csv():
+            return
+        
+        # Step 2: Explore data
+        processor.explore_data()
+        
+        # Step 3: Filter for courses from the cutoff year onwards
+        processor.filter_recent_courses()
+        
+        # Step 4: Clean data
+        processor.clean_data()
     
     # Step 5: Process for API
     processor.process_for_api()
@@ -336,7 +474,7 @@ def main():
     processor.generate_analysis_report()
     
     print(f"\n🎉 PROCESSING COMPLETE!")
-    print("📁 Your processed course data (2022+) is ready in:")
+    print(f"📁 Your processed course data ({args.since}+) is ready in:")
     print("   - processed_courses_2022_onwards.json (full dataset)")
     print("   - processed_courses_sample.json (200 courses for testing)")
     print("   - processed_courses_2022_onwards.csv (CSV format)")